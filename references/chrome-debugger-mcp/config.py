@@ -3,29 +3,116 @@ Configuration for Chrome DevTools MCP Wrapper
 Edit these values to customize behavior
 """
 
-# Command to launch the Chrome DevTools MCP server
-# Using the local reference server that was cloned
-CHROME_DEVTOOLS_COMMAND = "/Users/bmf/.local/share/fnm/node-versions/v22.20.0/installation/bin/node"
-CHROME_DEVTOOLS_ARGS = ["/Users/bmf/code/chrome-debugger-mcp/reference-chrome-devtools-mcp/build/src/index.js"]
-
-# Maximum result size in characters
-# Results larger than this will be REJECTED with a helpful error message
-# (not truncated - that would waste tokens on incomplete data)
-# 5000 chars ≈ 1250 tokens (rough estimate)
-MAX_RESULT_SIZE = 5000
-
-# Maximum DOM depth for query_elements
-# Elements nested deeper than this are filtered out to prevent returning
-# the entire page when querying broad selectors like "div"
-# Depth is measured from document.body
-# Setting this low (3) forces agents to use specific selectors
-# Agents can override with max_depth parameter up to HARD_MAX_DOM_DEPTH
-MAX_DOM_DEPTH = 3
-
-# Hard limit for DOM depth
-# Even if agent requests higher depth, this is the absolute maximum
-# Prevents returning massive amounts of irrelevant data
-HARD_MAX_DOM_DEPTH = 10
-
-# Enable debug logging
-DEBUG = True
+import functools
+import logging
+import os
+import shutil
+from dataclasses import dataclass
+
+# Chrome DevTools MCP server entry point (the local reference server that was cloned)
+# Override with $CHROME_DEVTOOLS_MCP_ENTRY
+_DEFAULT_ENTRY = "/Users/bmf/code/chrome-debugger-mcp/reference-chrome-devtools-mcp/build/src/index.js"
+
+
+@functools.cache
+def chrome_devtools_command() -> tuple[str, tuple[str, ...]]:
+    """
+    Resolve the command used to launch the Chrome DevTools MCP server.
+
+    The node binary comes from $CHROME_DEVTOOLS_NODE, falling back to `node`
+    on PATH. Resolution runs once per process; later calls return the cached
+    (command, args) pair, so args is a tuple to keep that shared value
+    immutable.
+    """
+    command = os.environ.get("CHROME_DEVTOOLS_NODE") or shutil.which("node") or "node"
+    args = (os.environ.get("CHROME_DEVTOOLS_MCP_ENTRY", _DEFAULT_ENTRY),)
+    return command, args
+
+
+def _pool_size_from_env() -> int:
+    """
+    Read $CHROME_POOL_SIZE, falling back to 0 (no pool) with a warning when
+    it is not an integer; negative values are clamped to 0.
+    """
+    raw = os.environ.get("CHROME_POOL_SIZE", "").strip()
+    if not raw:
+        return 0
+    try:
+        size = int(raw)
+    except ValueError:
+        logging.getLogger("chrome-debugger-mcp").warning(
+            "Ignoring CHROME_POOL_SIZE=%r (not an integer); the Chrome pool is disabled", raw
+        )
+        return 0
+    return max(0, size)
+
+
+@dataclass(frozen=True, slots=True)
+class Config:
+    """Immutable configuration snapshot, built once at import time."""
+    max_result_size: int
+    max_dom_depth: int
+    hard_max_dom_depth: int
+    chrome_pool_size: int
+    debug: bool
+
+
+CONFIG = Config(
+    # Maximum result size in characters
+    # Results larger than this will be REJECTED with a helpful error message
+    # (not truncated - that would waste tokens on incomplete data)
+    # 5000 chars ≈ 1250 tokens (rough estimate)
+    max_result_size=5000,
+
+    # Maximum DOM depth for query_elements
+    # Elements nested deeper than this are filtered out to prevent returning
+    # the entire page when querying broad selectors like "div"
+    # Depth is measured from document.body
+    # Setting this low (3) forces agents to use specific selectors
+    # Agents can override with max_depth parameter up to hard_max_dom_depth
+    max_dom_depth=3,
+
+    # Hard limit for DOM depth
+    # Even if agent requests higher depth, this is the absolute maximum
+    # Prevents returning massive amounts of irrelevant data
+    hard_max_dom_depth=10,
+
+    # Number of pre-launched headless Chrome instances kept ready for
+    # chrome_launch(0, headless=True)
+    # Set CHROME_POOL_SIZE in the environment; 0 disables the pool
+    chrome_pool_size=_pool_size_from_env(),
+
+    # Enable debug logging
+    # Set DEBUG=1 (or DEBUG=true) in the environment
+    debug=os.environ.get("DEBUG", "").lower() in ("1", "true"),
+)
+
+# Module-level aliases for existing `from config import X` call sites
+MAX_RESULT_SIZE = CONFIG.max_result_size
+MAX_DOM_DEPTH = CONFIG.max_dom_depth
+HARD_MAX_DOM_DEPTH = CONFIG.hard_max_dom_depth
+CHROME_POOL_SIZE = CONFIG.chrome_pool_size
+DEBUG = CONFIG.debug
+
+# Shared logger, level resolved once here. Use lazy %-formatting
+# (log.debug("msg %s", arg)) so disabled debug calls skip formatting.
+log = logging.getLogger("chrome-debugger-mcp")
+log.setLevel(logging.DEBUG if DEBUG else logging.INFO)
+
+
+def result_fits(s: str, _max: int = MAX_RESULT_SIZE) -> bool:
+    """Check a result against the character budget (len() on str is O(1))."""
+    return len(s) <= _max
+
+
+def clamp_dom_depth(requested: int | None, _default: int = MAX_DOM_DEPTH, _hard: int = HARD_MAX_DOM_DEPTH) -> int:
+    """
+    Resolve an agent-supplied max_depth: None (or negative) uses the default,
+    anything above the hard limit is clamped to it.
+
+    The limits are bound as default arguments so the check reads locals
+    instead of module globals.
+    """
+    if requested is None or requested < 0:
+        return _default
+    return requested if requested < _hard else _hard
@@ -6,29 +6,52 @@ Uses native Chrome DevTools tools with server-side ref resolution
 """
 
 import asyncio
+import atexit
+import functools
+import itertools
 import json
+import os
+import platform
 import re
 import logging
+import shutil
+import socket
+import subprocess
 import sys
+import tempfile
+import time
+import zlib
+from collections import Counter, deque
 from pathlib import Path
-from typing import Any, Optional, List, Tuple, Dict
+from typing import Any, Optional, List, Tuple, Dict, NamedTuple
 from contextlib import asynccontextmanager
 
 import websockets
 import aiohttp
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 from fastmcp import FastMCP
 
 # Import configuration
 from config import (
-    CHROME_DEVTOOLS_COMMAND,
-    CHROME_DEVTOOLS_ARGS,
+    chrome_devtools_command,
     MAX_RESULT_SIZE,
-    MAX_DOM_DEPTH,
-    HARD_MAX_DOM_DEPTH,
-    DEBUG
+    CHROME_POOL_SIZE,
+    clamp_dom_depth,
+    result_fits,
+    DEBUG,
+    log,
 )
 
 # Set up logging
@@ -36,9 +59,8 @@ log_dir = Path(__file__).parent / "logs"
 log_dir.mkdir(exist_ok=True)
 log_file = log_dir / "chrome-debugger-mcp.log"
 
-# Configure logger
-logger = logging.getLogger("chrome-debugger-mcp")
-logger.setLevel(logging.DEBUG if DEBUG else logging.INFO)
+# Configure logger (level is set in config)
+logger = log
 
 # File handler - always logs everything
 file_handler = logging.FileHandler(log_file, mode='a')
@@ -62,23 +84,204 @@ logger.info("="*80)
 logger.info("Chrome Debugger MCP Server Starting")
 logger.info(f"Log file: {log_file}")
 logger.info(f"Debug mode: {DEBUG}")
-logger.info(f"Chrome DevTools command: {CHROME_DEVTOOLS_COMMAND}")
-logger.info(f"Chrome DevTools args: {CHROME_DEVTOOLS_ARGS}")
 logger.info("="*80)
 
 
+# JSON codec for CDP traffic: orjson when installed, stdlib otherwise.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so existing
+# handlers keep working with either backend.
+if orjson is not None:
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj: Any) -> str:
+        # CDP expects text frames, so hand websockets a str rather than bytes
+        return orjson.dumps(obj).decode()
+
+    def _json_dumps_pretty(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+else:
+    _json_loads = json.loads
+    # Match orjson's compact output: no padding spaces, no \u escaping
+    _json_dumps = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+    _json_dumps_pretty = json.JSONEncoder(indent=2, ensure_ascii=False).encode
+
+
+# Accessibility snapshot element ref, e.g. '- textbox "username" [ref=1234]'
+_REF_RE = re.compile(r'\[ref=(\d+)\]')
+
+# How long a snapshot may be reused by find_element_ref (seconds)
+_SNAPSHOT_CACHE_TTL = 0.25
+
+# Lines searched for a ref, starting at the line that contains the marker
+_REF_SEARCH_LINES = 5
+
+
+# find_element_ref scripts, filled with %-formatting. String arguments are
+# encoded with _json_dumps so any selector is a valid JS string literal.
+# Every lookup uses a fresh marker, so a cleanup still in flight can only
+# remove its own. The page remembers (weakly) which element each
+# (selector, index) lookup key last marked, so `same` says whether a snapshot
+# taken for that earlier lookup still describes the current target.
+_MARK_SCRIPT_TMPL = (
+    "(() => {"
+    "const key = %s;"
+    "const marker = %s;"
+    "const elements = document.querySelectorAll(%s);"
+    "if (elements.length === 0) return {success: false, error: 'No elements found'};"
+    "if (%d >= elements.length) return {success: false, error: `Only ${elements.length} found`};"
+    "const target = elements[%d];"
+    "const marked = window.__mcpMarked || (window.__mcpMarked = new Map());"
+    "const prev = marked.get(key);"
+    "marked.set(key, new WeakRef(target));"
+    "target.setAttribute('data-mcp-marker', marker);"
+    "return {success: true, same: prev !== undefined && prev.deref() === target, "
+    "tag: target.tagName.toLowerCase(), text: target.textContent.trim().substring(0, 50)};"
+    "})()"
+)
+_CLEANUP_SCRIPT_TMPL = (
+    "(() => {"
+    "const el = document.querySelector(%s);"
+    "if (el) el.removeAttribute('data-mcp-marker');"
+    "})()"
+)
+
+
+def _find_ref_near_marker(snapshot_text: str, marker_id: str) -> Optional[str]:
+    """
+    Find the snapshot ref closest after a marker, without splitting the snapshot.
+
+    Searches the line containing the marker plus the following lines
+    (_REF_SEARCH_LINES in total) with a single bounded regex scan.
+    """
+    idx = snapshot_text.find(marker_id)
+    if idx < 0:
+        idx = snapshot_text.find(marker_id.replace('-', ''))
+        if idx < 0:
+            return None
+
+    start = snapshot_text.rfind('\n', 0, idx) + 1
+    end = idx
+    for _ in range(_REF_SEARCH_LINES):
+        end = snapshot_text.find('\n', end + 1)
+        if end < 0:
+            end = len(snapshot_text)
+            break
+
+    match = _REF_RE.search(snapshot_text, start, end)
+    return match.group(1) if match else None
+
+
+# HTTP session for CDP target discovery (/json), shared by all connections
+_discover_session: Optional[aiohttp.ClientSession] = None
+
+
+def _get_discover_session() -> aiohttp.ClientSession:
+    """Return the shared discovery session, creating it on first use"""
+    global _discover_session
+    # No await between the check and the assignment, so no lock is needed
+    if _discover_session is None or _discover_session.closed:
+        _discover_session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5))  # 5 second timeout
+    return _discover_session
+
+
+async def _close_discover_session():
+    """Close the shared discovery session if it was created"""
+    global _discover_session
+    if _discover_session is not None:
+        await _discover_session.close()
+        _discover_session = None
+
+
+def _extract_text(result: Any) -> str:
+    """Extract the text of the first content item from an MCP tool result"""
+    content = getattr(result, 'content', result)
+    if isinstance(content, list) and content:
+        first = content[0]
+        text = getattr(first, 'text', None)
+        return text if text is not None else str(first)
+    return str(content)
+
+
+def _expire_future(future: asyncio.Future) -> None:
+    """Timer callback: fail a pending CDP response future with a timeout"""
+    if not future.done():
+        future.set_exception(asyncio.TimeoutError())
+
+
+# Console messages / network responses kept per CDP connection
+_EVENT_LOG_SIZE = 1000
+
+
+def _console_arg_text(arg: dict) -> str:
+    """Render one Runtime.consoleAPICalled argument (a RemoteObject)"""
+    if "value" in arg:
+        value = arg["value"]
+        return value if isinstance(value, str) else _json_dumps(value)
+    return arg.get("description") or arg.get("type", "")
+
+
+class BpInfo(NamedTuple):
+    """A breakpoint set through the debugger tools (line is 1-indexed)"""
+    url: str
+    line: int
+    col: int
+    condition: Optional[str]
+    hit_condition: Optional[int]
+    hit_slot: Optional[str] = None  # Page global counting hits for hit_condition, once set
+
+    @property
+    def location(self) -> "BpInfo":
+        """The breakpoint as requested, without its counter slot (the dedupe key)"""
+        return self._replace(hit_slot=None)
+
+
 class CDPClient:
     """Direct Chrome DevTools Protocol client via WebSocket"""
 
+    __slots__ = (
+        "ws",
+        "ws_url",
+        "msg_id",
+        "pending_responses",
+        "_pending_acks",
+        "_ack_errors",
+        "paused_data",
+        "event_handlers",
+        "receive_task",
+        "breakpoints",
+        "bp_by_location",
+        "debugger_enabled",
+        "pause_on_exceptions",
+        "console_log",
+        "network_log",
+        "_request_urls",
+        "_main_frame_id",
+        "_loop",
+        "_event_queue",
+        "_dispatch_task",
+    )
+
     def __init__(self):
         self.ws = None
         self.ws_url = None
         self.msg_id = 0
         self.pending_responses = {}
+        self._pending_acks: Dict[int, tuple] = {}  # send_command_nowait ids -> (method, pause state to restore on error)
+        self._ack_errors: List[str] = []  # Rejected send_command_nowait commands, until reported
         self.paused_data = None
         self.event_handlers = {}
         self.receive_task = None
-        self.breakpoints = {}  # Map breakpoint IDs to their info
+        self.breakpoints: Dict[str, BpInfo] = {}  # Map breakpoint IDs to their info
+        self.bp_by_location: Dict[BpInfo, str] = {}  # Reverse index by BpInfo.location, to spot repeated sets
+        self.debugger_enabled = False  # Debugger.enable already sent on this connection
+        self.pause_on_exceptions = None  # Last state sent with Debugger.setPauseOnExceptions
+        self.console_log = deque(maxlen=_EVENT_LOG_SIZE)  # (type, text) from Runtime.consoleAPICalled
+        self.network_log = deque(maxlen=_EVENT_LOG_SIZE)  # (status, resource type, url, error) per response or failure
+        self._request_urls: Dict[str, str] = {}  # In-flight request URLs, for Network.loadingFailed
+        self._main_frame_id = None  # Top frame; its document requests mark a navigation
+        self._loop = None  # Event loop the connection runs on (set in connect)
+        self._event_queue = None  # Events waiting for custom handlers
+        self._dispatch_task = None
 
     async def connect(self, chrome_host: str = "localhost", chrome_port: int = 9222):
         """
@@ -88,22 +291,21 @@ class CDPClient:
             chrome_host: Chrome host (default: localhost)
             chrome_port: Chrome DevTools port (default: 9222)
         """
-        logger.debug(f"CDPClient.connect: Connecting to {chrome_host}:{chrome_port}")
+        logger.debug("CDPClient.connect: Connecting to %s:%s", chrome_host, chrome_port)
         try:
             # Get list of available targets from Chrome
-            logger.debug(f"Fetching targets from http://{chrome_host}:{chrome_port}/json")
-            timeout = aiohttp.ClientTimeout(total=5)  # 5 second timeout
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(f"http://{chrome_host}:{chrome_port}/json") as resp:
-                    targets = await resp.json()
-                    logger.debug(f"Found {len(targets)} targets")
+            logger.debug("Fetching targets from http://%s:%s/json", chrome_host, chrome_port)
+            session = _get_discover_session()
+            async with session.get(f"http://{chrome_host}:{chrome_port}/json") as resp:
+                targets = await resp.json()
+                logger.debug("Found %s targets", len(targets))
 
             # Find the first page target
             page_target = None
             for target in targets:
                 if target.get("type") == "page":
                     page_target = target
-                    logger.debug(f"Found page target: {target.get('title', 'Untitled')}")
+                    logger.debug("Found page target: %s", target.get('title', 'Untitled'))
                     break
 
             if not page_target:
@@ -112,78 +314,175 @@ class CDPClient:
                 raise RuntimeError(error_msg)
 
             self.ws_url = page_target["webSocketDebuggerUrl"]
-            logger.debug(f"Connecting to WebSocket: {self.ws_url}")
+            logger.debug("Connecting to WebSocket: %s", self.ws_url)
 
             # Connect to WebSocket
-            self.ws = await websockets.connect(self.ws_url)
+            # CDP runs over loopback: skip permessage-deflate and keepalive pings,
+            # and allow large messages (snapshots exceed the 1MB default)
+            self.ws = await websockets.connect(
+                self.ws_url,
+                compression=None,
+                max_size=2**26,
+                ping_interval=None
+            )
+            self._loop = asyncio.get_running_loop()
 
-            # Start receiving messages
+            # Start receiving messages; custom event handlers run on a separate
+            # task so a slow handler can't stall command responses
+            self._event_queue = asyncio.Queue(maxsize=1024)
+            self._dispatch_task = asyncio.create_task(self._dispatch_events())
             self.receive_task = asyncio.create_task(self._receive_loop())
 
+            # Subscribe once to console/network events; get_console_logs and
+            # get_network_requests then read the logs without a round-trip
+            _, _, frame_tree = await asyncio.gather(
+                self.send_command("Runtime.enable"),
+                self.send_command("Network.enable"),
+                self.send_command("Page.getFrameTree")
+            )
+            self._main_frame_id = frame_tree.get("frameTree", {}).get("frame", {}).get("id")
+
             logger.info(f"✓ Connected to Chrome CDP at {chrome_host}:{chrome_port}")
-            if DEBUG:
-                print(f"Connected to Chrome CDP: {self.ws_url}")
+            logger.debug("Connected to Chrome CDP: %s", self.ws_url)
 
         except Exception as e:
             error_msg = f"Failed to connect to Chrome CDP at {chrome_host}:{chrome_port}: {e}"
             logger.error(error_msg)
+            # The setup commands run on an open socket: don't leak it or its tasks
+            await self.disconnect()
+            self.ws = None
             raise RuntimeError(error_msg)
 
+    @property
+    def connected(self) -> bool:
+        """True while the WebSocket receive loop is running"""
+        return self.receive_task is not None and not self.receive_task.done()
+
     async def disconnect(self):
         """Disconnect from Chrome CDP"""
-        if self.receive_task:
-            self.receive_task.cancel()
-            try:
-                await self.receive_task
-            except asyncio.CancelledError:
-                pass
+        for task in (self.receive_task, self._dispatch_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
 
         if self.ws:
             await self.ws.close()
 
+        self.debugger_enabled = False
+        self.pause_on_exceptions = None
+        self._pending_acks.clear()
+        self._ack_errors.clear()
+
     async def _receive_loop(self):
         """Receive and handle messages from Chrome"""
         try:
             async for message in self.ws:
-                data = json.loads(message)
+                data = _json_loads(message)
 
                 # Response to a command
                 if "id" in data:
                     msg_id = data["id"]
-                    if msg_id in self.pending_responses:
-                        self.pending_responses[msg_id].set_result(data)
+                    future = self.pending_responses.get(msg_id)
+                    if future is not None:
+                        if not future.done():
+                            future.set_result(data)
+                    elif msg_id in self._pending_acks:
+                        self._handle_ack(msg_id, data)
 
                 # Event
                 elif "method" in data:
-                    await self._handle_event(data)
+                    method = data["method"]
+                    params = data.get("params", {})
+                    self._handle_event(method, params)
+
+                    # Queue for custom handlers (only block when the queue is full)
+                    if method in self.event_handlers:
+                        try:
+                            self._event_queue.put_nowait((method, params))
+                        except asyncio.QueueFull:
+                            await self._event_queue.put((method, params))
 
         except asyncio.CancelledError:
             pass
         except Exception as e:
-            if DEBUG:
-                print(f"CDP receive loop error: {e}")
-
-    async def _handle_event(self, event: dict):
-        """Handle CDP events"""
-        method = event["method"]
-        params = event.get("params", {})
-
+            logger.warning("CDP receive loop error: %s", e)
+
+    def _handle_ack(self, msg_id: int, data: dict):
+        """Settle a send_command_nowait reply; only errors matter"""
+        method, paused_data = self._pending_acks.pop(msg_id)
+        error = data.get("error")
+        if error is None:
+            return
+        logger.warning("CDP %s failed: %s", method, error)
+        self._ack_errors.append(f"{method} failed: {error.get('message', error)}")
+        # The command never ran, so execution is still paused where it was
+        if paused_data is not None and self.paused_data is None:
+            self.paused_data = paused_data
+
+    def _handle_event(self, method: str, params: dict):
+        """Track debugger state from CDP events (runs inline in the receive loop)"""
         # Store paused data for debugger_get_call_stack
         if method == "Debugger.paused":
             self.paused_data = params
-            if DEBUG:
-                reason = params.get("reason", "unknown")
-                print(f"Debugger paused: {reason}")
+            logger.debug("Debugger paused: %s", params.get("reason", "unknown"))
 
         # Clear paused data on resume
         elif method == "Debugger.resumed":
             self.paused_data = None
-            if DEBUG:
-                print("Debugger resumed")
-
-        # Call custom event handlers
-        if method in self.event_handlers:
-            await self.event_handlers[method](params)
+            logger.debug("Debugger resumed")
+
+        elif method == "Runtime.consoleAPICalled":
+            text = " ".join(_console_arg_text(arg) for arg in params.get("args", ()))
+            self.console_log.append((params.get("type", "log"), text))
+
+        elif method == "Network.requestWillBeSent":
+            request_id = params.get("requestId")
+            # A new top-level document starts a fresh page: drop the old logs
+            if (params.get("type") == "Document" and request_id == params.get("loaderId")
+                    and params.get("frameId") == self._main_frame_id):
+                self.console_log.clear()
+                self.network_log.clear()
+                self._request_urls.clear()
+            if len(self._request_urls) >= _EVENT_LOG_SIZE:
+                # Requests that never finished; forget the oldest
+                del self._request_urls[next(iter(self._request_urls))]
+            self._request_urls[request_id] = params.get("request", {}).get("url", "")
+
+        elif method == "Network.responseReceived":
+            response = params.get("response", {})
+            self.network_log.append((
+                response.get("status", 0),
+                params.get("type", ""),
+                response.get("url", ""),
+                None
+            ))
+
+        elif method == "Network.loadingFinished":
+            self._request_urls.pop(params.get("requestId"), None)
+
+        elif method == "Network.loadingFailed":
+            url = self._request_urls.pop(params.get("requestId"), "")
+            self.network_log.append((
+                0,
+                params.get("type", ""),
+                url,
+                params.get("errorText") or "failed"
+            ))
+
+    async def _dispatch_events(self):
+        """Run custom event handlers for queued events"""
+        while True:
+            method, params = await self._event_queue.get()
+            handler = self.event_handlers.get(method)
+            if handler is None:
+                continue
+            try:
+                await handler(params)
+            except Exception as e:
+                logger.warning("CDP event handler for %s failed: %s", method, e)
 
     async def send_command(self, method: str, params: dict = None) -> dict:
         """
@@ -208,26 +507,70 @@ class CDPClient:
             "params": params or {}
         }
 
-        # Create future for response
-        future = asyncio.Future()
+        # Create future for response (loop.create_future picks the C implementation)
+        future = self._loop.create_future()
         self.pending_responses[msg_id] = future
 
-        # Send command
-        await self.ws.send(json.dumps(message))
-
-        # Wait for response (with timeout)
+        # Single timer per command instead of a wait_for() task
+        timer = self._loop.call_later(10.0, _expire_future, future)
         try:
-            response = await asyncio.wait_for(future, timeout=10.0)
-            del self.pending_responses[msg_id]
+            # Send command and wait for response (with timeout)
+            await self.ws.send(_json_dumps(message))
+            response = await future
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"CDP command timeout: {method}")
+        finally:
+            timer.cancel()
+            self.pending_responses.pop(msg_id, None)
 
-            if "error" in response:
-                raise RuntimeError(f"CDP error: {response['error']}")
+        if "error" in response:
+            raise RuntimeError(f"CDP error: {response['error']}")
 
-            return response.get("result", {})
+        return response.get("result", {})
 
-        except asyncio.TimeoutError:
-            del self.pending_responses[msg_id]
-            raise RuntimeError(f"CDP command timeout: {method}")
+    async def send_command_nowait(self, method: str, params: dict = None, leaves_pause: bool = False) -> None:
+        """
+        Send a CDP command without waiting for its response.
+
+        For commands whose reply is an empty ack (stepping, resume, pause):
+        the Debugger.paused/resumed events carry the state that matters. The
+        receive loop settles the ack; a rejected command is kept for
+        take_ack_errors() so the next debugger tool can report it.
+
+        Args:
+            method: CDP method name
+            params: Method parameters
+            leaves_pause: The command ends the current pause (step/resume).
+                The pause state is dropped now, since Debugger.resumed can
+                arrive after a call stack request, and restored if Chrome
+                rejects the command
+        """
+        if not self.ws:
+            raise RuntimeError("Not connected to Chrome CDP")
+
+        self.msg_id += 1
+        msg_id = self.msg_id
+        paused_data = self.paused_data if leaves_pause else None
+        self._pending_acks[msg_id] = (method, paused_data)
+        if leaves_pause:
+            self.paused_data = None
+
+        try:
+            await self.ws.send(_json_dumps({
+                "id": msg_id,
+                "method": method,
+                "params": params or {}
+            }))
+        except Exception:
+            self._pending_acks.pop(msg_id, None)
+            if paused_data is not None and self.paused_data is None:
+                self.paused_data = paused_data
+            raise
+
+    def take_ack_errors(self) -> List[str]:
+        """Return and forget the send_command_nowait failures seen so far"""
+        errors, self._ack_errors = self._ack_errors, []
+        return errors
 
 
 class CDPConnectionManager:
@@ -249,7 +592,7 @@ class CDPConnectionManager:
         Returns:
             Success message
         """
-        logger.debug(f"CDPConnectionManager.connect: connection_id={connection_id}, host={host}, port={port}")
+        logger.debug("CDPConnectionManager.connect: connection_id=%s, host=%s, port=%s", connection_id, host, port)
 
         if connection_id in self.connections:
             error_msg = f"Error: Connection '{connection_id}' already exists. Use chrome_disconnect first."
@@ -258,15 +601,15 @@ class CDPConnectionManager:
 
         cdp = CDPClient()
         try:
-            logger.debug(f"Creating new CDPClient for connection '{connection_id}'")
+            logger.debug("Creating new CDPClient for connection '%s'", connection_id)
             await cdp.connect(chrome_host=host, chrome_port=port)
             self.connections[connection_id] = cdp
-            logger.debug(f"Added connection '{connection_id}' to connections dict")
+            logger.debug("Added connection '%s' to connections dict", connection_id)
 
             # Set as active if it's the first connection
             if self.active_connection_id is None:
                 self.active_connection_id = connection_id
-                logger.debug(f"Set '{connection_id}' as active connection")
+                logger.debug("Set '%s' as active connection", connection_id)
 
             success_msg = f"✓ Connected to Chrome at {host}:{port} (ID: {connection_id})"
             logger.info(success_msg)
@@ -293,8 +636,12 @@ class CDPConnectionManager:
 
     async def disconnect_all(self):
         """Disconnect all Chrome instances"""
-        for cdp in self.connections.values():
-            await cdp.disconnect()
+        if self.connections:
+            # Close concurrently; one failing socket shouldn't block the rest
+            await asyncio.gather(
+                *(cdp.disconnect() for cdp in self.connections.values()),
+                return_exceptions=True
+            )
         self.connections.clear()
         self.active_connection_id = None
 
@@ -318,14 +665,14 @@ class CDPConnectionManager:
 
     def list_connections(self) -> Dict[str, Dict]:
         """List all connections with their status"""
-        result = {}
-        for conn_id, cdp in self.connections.items():
-            result[conn_id] = {
+        return {
+            conn_id: {
                 "url": cdp.ws_url,
                 "active": conn_id == self.active_connection_id,
                 "paused": cdp.paused_data is not None
             }
-        return result
+            for conn_id, cdp in self.connections.items()
+        }
 
     def get_connection(self, connection_id: Optional[str] = None) -> Optional[CDPClient]:
         """
@@ -350,16 +697,23 @@ class ChromeDevToolsClient:
         self.exit_stack = None
         self._snapshot_cache = None
         self._snapshot_cache_time = 0
+        self._snapshot_markers: Dict[str, str] = {}  # find_element_ref lookup key -> marker present in the cached snapshot
+        self._marker_ids = itertools.count()  # Per-lookup marker suffixes
+        self._background_tasks: set = set()  # Strong refs to in-flight background tasks
+        self._pending_ops: Dict[Optional[str], list] = {}  # DOM ops waiting for the next batch flush, by connection_id
+        self._dom_bundle_installed: set = set()  # connection_ids whose page was sent window.__mcp
+        self._cached_sessions: Dict[Optional[str], CDPClient] = {}  # Resolved CDP clients by connection_id
         self.cdp_manager = CDPConnectionManager()  # Multi-instance CDP manager
 
     async def connect(self):
         """Connect to the Chrome DevTools MCP server"""
-        logger.info(f"Connecting to Chrome DevTools MCP server: {CHROME_DEVTOOLS_COMMAND} {' '.join(CHROME_DEVTOOLS_ARGS)}")
+        command, args = chrome_devtools_command()
+        logger.info(f"Connecting to Chrome DevTools MCP server: {command} {' '.join(args)}")
 
         try:
             server_params = StdioServerParameters(
-                command=CHROME_DEVTOOLS_COMMAND,
-                args=CHROME_DEVTOOLS_ARGS,
+                command=command,
+                args=args,
                 env=None
             )
 
@@ -393,12 +747,36 @@ class ChromeDevToolsClient:
 
     async def disconnect(self):
         """Disconnect from the Chrome DevTools MCP server and all CDP connections"""
+        self.invalidate_sessions()
         await self.cdp_manager.disconnect_all()
+        await _close_discover_session()
         if self.session:
             await self.session.__aexit__(None, None, None)
         if self.exit_stack:
             await self.exit_stack.__aexit__(None, None, None)
 
+    def get_session(self, connection_id: Optional[str] = None) -> Optional[CDPClient]:
+        """
+        Get the CDP client for connection_id (or the active connection if None).
+
+        Resolved clients are cached per connection_id; a cached client whose
+        WebSocket has dropped is looked up again through cdp_manager.
+        """
+        cdp = self._cached_sessions.get(connection_id)
+        if cdp is not None and cdp.connected:
+            return cdp
+
+        cdp = self.cdp_manager.get_connection(connection_id)
+        if cdp is not None:
+            self._cached_sessions[connection_id] = cdp
+        else:
+            self._cached_sessions.pop(connection_id, None)
+        return cdp
+
+    def invalidate_sessions(self):
+        """Drop cached CDP clients (call after connections are added, removed or switched)"""
+        self._cached_sessions.clear()
+
     async def call_tool(self, tool_name: str, arguments: dict) -> Any:
         """Call a tool on the Chrome DevTools MCP server"""
         if not self.session:
@@ -409,11 +787,107 @@ class ChromeDevToolsClient:
 
     async def evaluate(self, script: str) -> str:
         """Evaluate JavaScript and return result"""
-        result = await self.call_tool("evaluate_script", {"script": script})
-        content = result.content if hasattr(result, 'content') else result
-        if isinstance(content, list) and len(content) > 0:
-            return content[0].text if hasattr(content[0], 'text') else str(content[0])
-        return str(content)
+        return _extract_text(await self.call_tool("evaluate_script", {"script": script}))
+
+    async def evaluate_value(self, script: str, connection_id: Optional[str] = None) -> Any:
+        """
+        Evaluate JavaScript and return its result as a Python value.
+
+        With a connection_id the script runs over that CDP connection with
+        returnByValue, so the value arrives already decoded in the CDP
+        response. Otherwise it goes through the MCP evaluate_script tool and
+        the returned text is parsed.
+
+        Raises:
+            RuntimeError: If the connection is missing, the script throws or
+                the MCP tool returns text that is not JSON
+        """
+        if connection_id is None:
+            raw = await self.evaluate(script)
+            try:
+                return _json_loads(raw)
+            except json.JSONDecodeError:
+                raise RuntimeError(f"Unexpected evaluate result: {raw[:200]}") from None
+
+        cdp = self.get_session(connection_id)
+        if cdp is None:
+            raise RuntimeError(f"No Chrome connection '{connection_id}' found")
+
+        response = await cdp.send_command("Runtime.evaluate", {"expression": script, "returnByValue": True})
+        details = response.get("exceptionDetails")
+        if details:
+            raise RuntimeError(details.get("exception", {}).get("description") or details.get("text", "Evaluation failed"))
+        return response.get("result", {}).get("value")
+
+    def _spawn(self, coro) -> asyncio.Task:
+        """Start a background task, keeping a reference until it finishes"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def run_dom_op(self, op: str, *args, connection_id: Optional[str] = None) -> Any:
+        """
+        Run one of the _DOM_OPS_JS operations in the page and return its result.
+
+        Ops queued for the same connection during the same event-loop tick are
+        flushed together as a single evaluate call, so concurrent tool calls
+        share one round-trip. See evaluate_value() for how connection_id
+        picks the page.
+
+        Raises:
+            RuntimeError: If the op throws in the page or the batch result is malformed
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self._pending_ops:
+            loop.call_soon(self._flush_dom_ops)
+        self._pending_ops.setdefault(connection_id, []).append((op, args, future))
+        return await future
+
+    def _flush_dom_ops(self):
+        """Send the queued DOM ops as one batch per connection"""
+        pending, self._pending_ops = self._pending_ops, {}
+        for connection_id, batch in pending.items():
+            self._spawn(self._run_dom_batch(batch, connection_id))
+
+    async def _run_dom_batch(self, batch: list, connection_id: Optional[str] = None):
+        """Evaluate a batch of DOM ops and resolve each op's future"""
+        ops = _json_dumps([{"op": op, "args": args} for op, args, _ in batch])
+        try:
+            # Send only the call while the page should still hold the bundle;
+            # ship the whole bundle on first use or when the page lost it
+            results = None
+            if connection_id in self._dom_bundle_installed:
+                results = await self.evaluate_value(_DOM_CALL_SCRIPT_TMPL % ops, connection_id)
+                if isinstance(results, dict) and results.get("__mcpMissing"):
+                    results = None
+            if results is None:
+                results = await self.evaluate_value(_DOM_INSTALL_SCRIPT_TMPL % (_DOM_BUNDLE_JS, ops), connection_id)
+                self._dom_bundle_installed.add(connection_id)
+            if (not isinstance(results, list) or len(results) != len(batch)
+                    or not all(isinstance(item, dict) for item in results)):
+                raise RuntimeError(f"Unexpected DOM batch result: {str(results)[:200]}")
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError(str(e)))
+            return
+
+        for (_, _, future), item in zip(batch, results):
+            if future.done():
+                continue
+            if item.get("ok"):
+                future.set_result(item.get("value"))
+            else:
+                future.set_exception(RuntimeError(item.get("error", "Unknown error")))
+
+    async def _safe_evaluate(self, script: str):
+        """Evaluate a best-effort script in the background, logging failures"""
+        try:
+            await self.evaluate(script)
+        except Exception as e:
+            logger.debug("Background evaluate failed: %s", e)
 
     async def call_cdp(self, method: str, params: dict = None) -> dict:
         """
@@ -439,7 +913,7 @@ class ChromeDevToolsClient:
         (async () => {{
             // Try to access CDP if available
             if (window.__cdp) {{
-                return await window.__cdp.send('{method}', {json.dumps(params)});
+                return await window.__cdp.send('{method}', {_json_dumps(params)});
             }}
             throw new Error('CDP not available - this requires Chrome DevTools MCP server with CDP access');
         }})()
@@ -447,17 +921,18 @@ class ChromeDevToolsClient:
 
         result = await self.evaluate(script)
         try:
-            return json.loads(result)
+            return _json_loads(result)
         except json.JSONDecodeError:
             return {"error": "Failed to parse CDP response", "raw": result}
 
     async def get_snapshot(self) -> str:
         """Get accessibility snapshot"""
-        result = await self.call_tool("take_snapshot", {})
-        content = result.content if hasattr(result, 'content') else result
-        if isinstance(content, list) and len(content) > 0:
-            return content[0].text if hasattr(content[0], 'text') else str(content[0])
-        return str(content)
+        return _extract_text(await self.call_tool("take_snapshot", {}))
+
+    def invalidate_snapshot(self):
+        """Drop the cached snapshot (call after anything that mutates the page)"""
+        self._snapshot_cache = None
+        self._snapshot_markers = {}
 
     async def find_element_ref(self, selector: str, index: int = 0) -> Tuple[Optional[str], str]:
         """
@@ -472,76 +947,48 @@ class ChromeDevToolsClient:
         5. Return ref
         """
         try:
-            # Generate unique marker ID
-            marker_id = f"mcp-wrapper-{id(self)}-{index}"
-
-            # Escape selector for JavaScript
-            escaped_selector = selector.replace("'", "\\'")
+            # Unique marker for this call; the lookup key is stable per
+            # (selector, index) and ties a cached snapshot to the element it saw
+            lookup_key = f"{index}-{hash(selector) & 0xffffffff:x}"
+            marker_id = f"mcp-wrapper-{id(self)}-{next(self._marker_ids)}"
 
             # Step 1: Mark the target element
-            mark_script = f"""
-            (() => {{
-                const elements = document.querySelectorAll('{escaped_selector}');
-                if (elements.length === 0) return {{ success: false, error: 'No elements found' }};
-                if ({index} >= elements.length) return {{ success: false, error: `Only ${{elements.length}} found` }};
-
-                const target = elements[{index}];
-                target.setAttribute('data-mcp-marker', '{marker_id}');
-
-                return {{
-                    success: true,
-                    tag: target.tagName.toLowerCase(),
-                    text: target.textContent.trim().substring(0, 50)
-                }};
-            }})()
-            """
+            mark_script = _MARK_SCRIPT_TMPL % (
+                _json_dumps(lookup_key), _json_dumps(marker_id), _json_dumps(selector), index, index
+            )
 
             mark_result = await self.evaluate(mark_script)
-            mark_data = json.loads(mark_result)
+            mark_data = _json_loads(mark_result)
 
             if not mark_data.get('success'):
                 return None, mark_data.get('error', 'Unknown error')
 
-            # Step 2: Take snapshot to get refs
-            snapshot_text = await self.get_snapshot()
-
-            # Step 3: Find the marker in snapshot and extract ref
+            # Step 2 + 3: Take snapshot to get refs, find the marker and extract ref
             # The snapshot format has lines like: "- textbox "username" [ref=1234]"
-            # We need to find our marker attribute
-            ref = None
+            # The marker might show as an attribute or in the element description,
+            # with the ref on the same line or one of the next few lines
             debug_info = f"<{mark_data['tag']}>"
+            ref = None
 
-            # Look for data-mcp-marker in the snapshot
-            # The snapshot might show it as an attribute or in the element description
-            pattern = rf'\[ref=(\d+)\]'
-
-            # Split snapshot into lines and search
-            lines = snapshot_text.split('\n')
-            for i, line in enumerate(lines):
-                # Look for our marker ID in this line or nearby lines
-                if marker_id in line or marker_id.replace('-', '') in line:
-                    # Try to find ref in this line
-                    match = re.search(pattern, line)
-                    if match:
-                        ref = match.group(1)
-                        break
-                    # Check next few lines in case ref is on a different line
-                    for j in range(i, min(i + 5, len(lines))):
-                        match = re.search(pattern, lines[j])
-                        if match:
-                            ref = match.group(1)
-                            break
-                    if ref:
-                        break
-
-            # Step 4: Clean up marker
-            cleanup_script = f"""
-            (() => {{
-                const el = document.querySelector('[data-mcp-marker="{marker_id}"]');
-                if (el) el.removeAttribute('data-mcp-marker');
-            }})()
-            """
-            await self.evaluate(cleanup_script)
+            # Reuse a recent snapshot taken by an earlier lookup with this key,
+            # if that lookup marked this same element. The snapshot shows the
+            # earlier call's marker, so search for that one
+            cached_marker = self._snapshot_markers.get(lookup_key)
+            if (mark_data.get('same') and cached_marker is not None and self._snapshot_cache is not None
+                    and time.monotonic() - self._snapshot_cache_time < _SNAPSHOT_CACHE_TTL):
+                ref = _find_ref_near_marker(self._snapshot_cache, cached_marker)
+
+            if ref is None:
+                snapshot_text = await self.get_snapshot()
+                self._snapshot_cache = snapshot_text
+                self._snapshot_cache_time = time.monotonic()
+                self._snapshot_markers = {lookup_key: marker_id}
+                ref = _find_ref_near_marker(snapshot_text, marker_id)
+
+            # Step 4: Clean up marker (best effort, off the critical path). The
+            # marker is unique to this call, so a later lookup's marker is never hit
+            cleanup_script = _CLEANUP_SCRIPT_TMPL % _json_dumps(f'[data-mcp-marker="{marker_id}"]')
+            self._spawn(self._safe_evaluate(cleanup_script))
 
             if ref:
                 return ref, f"{debug_info} [ref={ref}]"
@@ -560,6 +1007,208 @@ mcp = FastMCP("Chrome DevTools Wrapper")
 chrome_client: Optional[ChromeDevToolsClient] = None
 
 
+# Chrome install locations, in order of preference
+_MAC_CHROME_PATHS = (
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+    "/Applications/Google Chrome Canary.app/Contents/MacOS/Google Chrome Canary",
+    "/Applications/Chromium.app/Contents/MacOS/Chromium",
+)
+_LINUX_CHROME_NAMES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser")
+_WINDOWS_CHROME_PATHS = (
+    "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe",
+    "C:\\Program Files (x86)\\Google\\Chrome\\Application\\chrome.exe",
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _chrome_executable() -> str:
+    """
+    Locate the Chrome executable for this platform (resolved once per process).
+
+    Falls back to the standard install location when nothing is found, so
+    launch errors still name the expected path.
+
+    Raises:
+        RuntimeError: If the platform is not supported
+    """
+    system = platform.system()
+    logger.debug("Platform: %s", system)
+
+    if system == "Darwin":  # macOS
+        return next((p for p in _MAC_CHROME_PATHS if os.path.exists(p)), _MAC_CHROME_PATHS[0])
+    elif system == "Linux":
+        return next((p for p in map(shutil.which, _LINUX_CHROME_NAMES) if p), _LINUX_CHROME_NAMES[0])
+    elif system == "Windows":
+        return next((p for p in _WINDOWS_CHROME_PATHS if os.path.exists(p)), _WINDOWS_CHROME_PATHS[0])
+
+    raise RuntimeError(f"Unsupported platform: {system}")
+
+
+class LaunchedChrome(NamedTuple):
+    """A Chrome process started with remote debugging on `port`"""
+    process: subprocess.Popen
+    port: int
+
+
+# Pre-launched headless Chrome instances waiting to be leased by chrome_launch
+_chrome_pool: asyncio.Queue = asyncio.Queue()
+_pool_task: Optional[asyncio.Task] = None
+
+# In-flight launches by debug port, so concurrent launches on one port share a process
+_launch_promises: Dict[int, asyncio.Future] = {}
+
+
+def _free_port() -> int:
+    """Ask the OS for an unused local TCP port"""
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+def _build_chrome_command(debug_port: int, headless: bool, user_data_dir: Optional[str], extra_args: Optional[str]) -> List[str]:
+    """
+    Build the command line for a Chrome instance with remote debugging.
+
+    Raises:
+        RuntimeError: If the platform is not supported
+    """
+    # Determine Chrome executable path
+    chrome_path = _chrome_executable()
+    logger.info(f"Chrome executable path: {chrome_path}")
+
+    # Build command
+    cmd = [chrome_path, f"--remote-debugging-port={debug_port}"]
+
+    # Add user data dir (required to avoid conflicts with existing Chrome)
+    if user_data_dir:
+        cmd.append(f"--user-data-dir={user_data_dir}")
+        logger.debug("Using user data dir: %s", user_data_dir)
+    else:
+        temp_dir = tempfile.mkdtemp(prefix="chrome-debug-")
+        cmd.append(f"--user-data-dir={temp_dir}")
+        logger.debug("Created temp user data dir: %s", temp_dir)
+
+    # Add headless mode
+    if headless:
+        cmd.append("--headless=new")
+        logger.debug("Headless mode enabled")
+
+    # Add extra args
+    if extra_args:
+        cmd.extend(extra_args.split())
+        logger.debug("Extra args: %s", extra_args)
+
+    return cmd
+
+
+async def _wait_ready(port: int, process: subprocess.Popen, timeout: float = 5.0) -> bool:
+    """
+    Poll Chrome's /json/version endpoint until it answers, backing off
+    exponentially between attempts.
+
+    Returns:
+        True once the port answers; False if the process exits or the timeout passes
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    delay = 0.05
+    session = _get_discover_session()
+    while loop.time() < deadline and process.poll() is None:
+        try:
+            async with session.get(f"http://localhost:{port}/json/version", timeout=aiohttp.ClientTimeout(total=0.5)) as resp:
+                if resp.status == 200:
+                    return True
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+        await asyncio.sleep(delay)
+        delay = min(delay * 1.5, 0.25)
+    return False
+
+
+async def _launch_chrome(debug_port: int, headless: bool = False, user_data_dir: Optional[str] = None, extra_args: Optional[str] = None) -> LaunchedChrome:
+    """
+    Start Chrome with remote debugging on debug_port and wait for it to come up.
+
+    A launch already in flight for the same port is shared instead of
+    starting a second process that could not bind the port.
+
+    Raises:
+        RuntimeError: If the platform is not supported
+        OSError: If the Chrome process cannot be started
+    """
+    pending = _launch_promises.get(debug_port)
+    if pending is not None:
+        logger.debug("Joining in-flight Chrome launch on port %s", debug_port)
+        return await asyncio.shield(pending)
+
+    future = asyncio.get_running_loop().create_future()
+    _launch_promises[debug_port] = future
+    try:
+        cmd = _build_chrome_command(debug_port, headless, user_data_dir, extra_args)
+        logger.info(f"Launching Chrome with command: {' '.join(cmd)}")
+
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+        logger.info(f"Chrome process started with PID: {process.pid}")
+
+        # Wait for the debug port to answer rather than a fixed delay
+        logger.debug("Waiting for Chrome debug port %s...", debug_port)
+        if not await _wait_ready(debug_port, process):
+            logger.warning("Chrome debug port %s not ready (process exit code: %s)", debug_port, process.poll())
+
+        launched = LaunchedChrome(process, debug_port)
+        future.set_result(launched)
+        return launched
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # Mark retrieved; joiners (if any) still get it
+        raise
+    finally:
+        del _launch_promises[debug_port]
+
+
+async def _fill_chrome_pool():
+    """Launch headless instances until the pool holds CHROME_POOL_SIZE of them"""
+    while _chrome_pool.qsize() < CHROME_POOL_SIZE:
+        try:
+            launched = await _launch_chrome(_free_port(), headless=True)
+        except Exception as e:
+            logger.warning("Could not pre-launch pooled Chrome: %s", e)
+            return
+        _chrome_pool.put_nowait(launched)
+        logger.debug("Pooled Chrome ready on port %s (PID %s)", launched.port, launched.process.pid)
+
+
+def _replenish_chrome_pool():
+    """Start topping up the pool in the background, unless already doing so"""
+    global _pool_task
+    if CHROME_POOL_SIZE > 0 and (_pool_task is None or _pool_task.done()):
+        _pool_task = asyncio.create_task(_fill_chrome_pool())
+
+
+def _lease_pooled_chrome() -> Optional[LaunchedChrome]:
+    """Take a ready pooled instance, skipping any that exited while idle"""
+    while not _chrome_pool.empty():
+        launched = _chrome_pool.get_nowait()
+        if launched.process.poll() is None:
+            return launched
+    return None
+
+
+@atexit.register
+def _terminate_chrome_pool():
+    """Stop pooled instances that were never leased"""
+    while not _chrome_pool.empty():
+        _chrome_pool.get_nowait().process.terminate()
+
+
 async def ensure_chrome_client():
     """Ensure chrome_client is initialized, creating it if necessary"""
     global chrome_client
@@ -569,12 +1218,40 @@ async def ensure_chrome_client():
             chrome_client = ChromeDevToolsClient()
             await chrome_client.connect()
             logger.info("ChromeDevToolsClient initialized successfully")
+            _replenish_chrome_pool()
         except Exception as e:
             logger.error(f"Failed to initialize ChromeDevToolsClient: {e}", exc_info=True)
             raise
     return chrome_client
 
 
+_NO_CONN_DEFAULT = "Error: No Chrome connection found. Use chrome_connect() or chrome_launch() first."
+
+
+def _no_conn_error(connection_id: Optional[str]) -> str:
+    """Error returned when a tool's connection (or the default one) doesn't exist"""
+    if not connection_id:
+        return _NO_CONN_DEFAULT
+    return f"Error: No Chrome connection '{connection_id}' found. Use chrome_connect() or chrome_launch() first."
+
+
+async def _resolve_cdp(connection_id: Optional[str]) -> Tuple[Optional[CDPClient], Optional[str]]:
+    """
+    Resolve the CDP connection a debugger tool should use.
+
+    Returns (cdp, None), or (None, error message) when there is no such
+    connection. Once chrome_client exists the lookup is synchronous, served
+    from its per-connection_id session cache.
+    """
+    if chrome_client is None:
+        await ensure_chrome_client()
+
+    cdp = chrome_client.get_session(connection_id)
+    if cdp is None:
+        return None, _no_conn_error(connection_id)
+    return cdp, None
+
+
 def analyze_query_elements_data(elements_json: dict) -> str:
     """
     Analyze query_elements JSON data and provide specific narrowing suggestions.
@@ -584,18 +1261,17 @@ def analyze_query_elements_data(elements_json: dict) -> str:
     if not elements:
         return "No elements found"
 
-    # Collect class, id, and tag data
-    classes = []
+    # Collect class, id, and tag data in one pass
+    classes = Counter()
     ids = []
-    tags = []
+    tags = Counter()
 
     for el in elements:
-        if el.get('classes'):
-            classes.extend(el['classes'])
+        classes.update(el.get('classes') or ())
         if el.get('id'):
             ids.append(el['id'])
         if el.get('tag'):
-            tags.append(el['tag'])
+            tags[el['tag']] += 1
 
     suggestions = []
     total = len(elements)
@@ -603,10 +1279,7 @@ def analyze_query_elements_data(elements_json: dict) -> str:
 
     # Suggest specific classes (most common)
     if classes:
-        class_counts = {}
-        for c in classes:
-            class_counts[c] = class_counts.get(c, 0) + 1
-        top_classes = sorted(class_counts.items(), key=lambda x: x[1], reverse=True)[:3]
+        top_classes = classes.most_common(3)
         class_suggestions = [f'.{c[0]} ({c[1]} elements)' for c in top_classes]
         suggestions.append(f"  Most common classes: {', '.join(class_suggestions)}")
 
@@ -616,13 +1289,9 @@ def analyze_query_elements_data(elements_json: dict) -> str:
         suggestions.append(f"  IDs available: {', '.join(id_suggestions)}")
 
     # Suggest tag narrowing
-    if tags:
-        tag_counts = {}
-        for t in tags:
-            tag_counts[t] = tag_counts.get(t, 0) + 1
-        if len(tag_counts) > 1:
-            tag_list = [f'{t} ({c})' for t, c in sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)[:5]]
-            suggestions.append(f"  Tag breakdown: {', '.join(tag_list)}")
+    if len(tags) > 1:
+        tag_list = [f'{t} ({c})' for t, c in tags.most_common(5)]
+        suggestions.append(f"  Tag breakdown: {', '.join(tag_list)}")
 
     suggestions.append(f"\nTry: Combine selector with a class (e.g., 'yourselector.{top_classes[0][0] if classes else 'classname'}')")
     suggestions.append(f"Or: Reduce limit parameter (currently showing {total} elements)")
@@ -630,42 +1299,16 @@ def analyze_query_elements_data(elements_json: dict) -> str:
     return "\n".join(suggestions)
 
 
-def check_result_size(result: str, max_size: int = MAX_RESULT_SIZE, context: str = "", analysis_data: Any = None) -> str:
-    """
-    Check if result is too large and return helpful error if so.
-
-    Instead of truncating (which wastes tokens on useless partial data),
-    reject oversized results with a smart error message that analyzes the data
-    and provides specific suggestions for narrowing the query.
-
-    Args:
-        result: The result string to check
-        max_size: Maximum allowed size in characters
-        context: Tool context for suggestions (query_elements, console_logs, etc.)
-        analysis_data: Optional structured data for deterministic analysis (e.g., JSON from query_elements)
-    """
-    if len(result) <= max_size:
-        return result
-
-    # Result is too large - provide smart suggestions
-    size_kb = len(result) / 1024
-    limit_kb = max_size / 1024
-
-    # Perform deterministic analysis if we have structured data
-    smart_analysis = ""
-    if context == "query_elements" and analysis_data:
-        smart_analysis = analyze_query_elements_data(analysis_data)
-    else:
-        # Generic but helpful suggestions for tools where we don't control the format
-        generic_suggestions = {
-            "console_logs": """Too many console messages.
+# Generic but helpful suggestions for tools where we don't control the format
+_GENERIC_SUGGESTIONS = {
+    "console_logs": """Too many console messages.
 
 Try filtering by level:
   - get_console_logs(filter_level='error') - Only errors
   - get_console_logs(filter_level='warning') - Warnings and errors
   - get_console_logs(filter_level='info') - Info, warnings, and errors""",
 
-            "network_requests": """Too many network requests.
+    "network_requests": """Too many network requests.
 
 Try filtering by status:
   - get_network_requests(filter_status='4xx') - Client errors (404, etc.)
@@ -673,7 +1316,7 @@ Try filtering by status:
   - get_network_requests(filter_status='2xx') - Successful requests
   - get_network_requests(filter_status='3xx') - Redirects""",
 
-            "execute_script": """Script returned too much data.
+    "execute_script": """Script returned too much data.
 
 Try limiting the result in JavaScript:
   - Use .slice(0, 10) to get first 10 items
@@ -681,20 +1324,60 @@ Try limiting the result in JavaScript:
   - Return summary data instead of full objects
   - Select only needed fields: .map(x => ({id: x.id, name: x.name}))""",
 
-            "default": "Try to be more specific in your query or filter the results"
-        }
-        smart_analysis = generic_suggestions.get(context, generic_suggestions["default"])
+    "default": "Try to be more specific in your query or filter the results"
+}
 
-    error_msg = f"""Result too large: {size_kb:.1f}KB (limit: {limit_kb:.1f}KB)
 
-Returning {len(result):,} characters would waste tokens on potentially incomplete data.
+def check_result_size(result: str, max_size: int = MAX_RESULT_SIZE, context: str = "", analysis_data: Any = None) -> str:
+    """
+    Check if result is too large and return helpful error if so.
 
-{smart_analysis}
+    Instead of truncating (which wastes tokens on useless partial data),
+    reject oversized results with a smart error message that analyzes the data
+    and provides specific suggestions for narrowing the query.
 
-Size: {len(result):,} chars (max: {max_size:,})
-"""
+    Args:
+        result: The result string to check
+        max_size: Maximum allowed size in characters
+        context: Tool context for suggestions (query_elements, console_logs, etc.)
+        analysis_data: Optional structured data for deterministic analysis (e.g., JSON from query_elements)
+    """
+    if result_fits(result, max_size):
+        return result
+
+    # Result is too large - provide smart suggestions. A partial result
+    # (formatting stopped at the budget) only tells us it is over the limit
+    size = len(result)
+    partial = isinstance(analysis_data, dict) and analysis_data.get('partial')
 
-    return error_msg
+    # Perform deterministic analysis if we have structured data
+    if context == "query_elements" and analysis_data:
+        smart_analysis = analyze_query_elements_data(analysis_data)
+    else:
+        smart_analysis = _GENERIC_SUGGESTIONS.get(context, _GENERIC_SUGGESTIONS["default"])
+
+    if partial:
+        return "\n".join((
+            f"Result too large: over the {max_size / 1024:.1f}KB limit",
+            "",
+            f"Returning more than {max_size:,} characters would waste tokens on potentially incomplete data.",
+            "",
+            smart_analysis,
+            "",
+            f"Size: over limit (max: {max_size:,} chars)",
+            "",
+        ))
+
+    return "\n".join((
+        f"Result too large: {size / 1024:.1f}KB (limit: {max_size / 1024:.1f}KB)",
+        "",
+        f"Returning {size:,} characters would waste tokens on potentially incomplete data.",
+        "",
+        smart_analysis,
+        "",
+        f"Size: {size:,} chars (max: {max_size:,})",
+        "",
+    ))
 
 
 #
@@ -726,8 +1409,9 @@ async def chrome_connect(port: int = 9222, connection_id: str = "default", host:
     await ensure_chrome_client()
 
     try:
-        logger.debug(f"Calling cdp_manager.connect with connection_id={connection_id}, host={host}, port={port}")
+        logger.debug("Calling cdp_manager.connect with connection_id=%s, host=%s, port=%s", connection_id, host, port)
         result = await chrome_client.cdp_manager.connect(connection_id, host, port)
+        chrome_client.invalidate_sessions()
         logger.info(f"✓ Successfully connected to Chrome at {host}:{port} (connection_id={connection_id})")
         return result
     except Exception as e:
@@ -743,7 +1427,9 @@ async def chrome_launch(debug_port: int = 9222, headless: bool = False, user_dat
     Automatically connects to the launched instance after startup.
 
     Args:
-        debug_port: Remote debugging port (default: 9222)
+        debug_port: Remote debugging port (default: 9222). 0 picks a free port; with
+            headless=True and no other options it leases a pre-launched instance
+            from the pool (see CHROME_POOL_SIZE) when one is ready
         headless: Run in headless mode (default: False)
         user_data_dir: Custom user data directory path (optional, creates temp if not specified)
         extra_args: Additional Chrome flags as space-separated string (e.g., "--disable-gpu --window-size=1920,1080")
@@ -756,92 +1442,52 @@ async def chrome_launch(debug_port: int = 9222, headless: bool = False, user_dat
         chrome_launch(9300)                                    # Launch on port 9300
         chrome_launch(9400, headless=True)                     # Headless mode
         chrome_launch(9500, extra_args="--incognito --start-maximized")
+        chrome_launch(0, headless=True)                        # Any free port, pooled if available
     """
     logger.info(f"chrome_launch called: port={debug_port}, headless={headless}, user_data_dir={user_data_dir}, extra_args={extra_args}, connection_id={connection_id}")
 
     await ensure_chrome_client()
 
-    import subprocess
-    import platform
-    import tempfile
-    import os
+    # Any port and default flags: lease a pre-launched instance if one is ready
+    launched = None
+    if debug_port == 0 and headless and not user_data_dir and not extra_args:
+        launched = _lease_pooled_chrome()
+        _replenish_chrome_pool()
+        if launched:
+            logger.info("Leased pooled Chrome (PID: %s, port: %s)", launched.process.pid, launched.port)
+
+    if launched is None:
+        if debug_port == 0:
+            debug_port = _free_port()
+        try:
+            launched = await _launch_chrome(debug_port, headless, user_data_dir, extra_args)
+        except RuntimeError as e:
+            error_msg = f"Error: {e}"
+            logger.error(error_msg)
+            return error_msg
+        except Exception as e:
+            error_msg = f"Error launching Chrome: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            return error_msg
+
+    process, debug_port = launched
 
-    # Determine Chrome executable path
-    system = platform.system()
-    logger.debug(f"Platform: {system}")
+    # Auto-generate connection ID if needed
+    if connection_id == "auto":
+        connection_id = f"chrome-{debug_port}"
+        logger.debug("Auto-generated connection ID: %s", connection_id)
 
-    if system == "Darwin":  # macOS
-        chrome_path = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
-    elif system == "Linux":
-        chrome_path = "google-chrome"
-    elif system == "Windows":
-        chrome_path = "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe"
-    else:
-        error_msg = f"Error: Unsupported platform: {system}"
-        logger.error(error_msg)
-        return error_msg
-
-    logger.info(f"Chrome executable path: {chrome_path}")
-
-    # Build command
-    cmd = [chrome_path, f"--remote-debugging-port={debug_port}"]
-
-    # Add user data dir (required to avoid conflicts with existing Chrome)
-    if user_data_dir:
-        cmd.append(f"--user-data-dir={user_data_dir}")
-        logger.debug(f"Using user data dir: {user_data_dir}")
-    else:
-        temp_dir = tempfile.mkdtemp(prefix="chrome-debug-")
-        cmd.append(f"--user-data-dir={temp_dir}")
-        logger.debug(f"Created temp user data dir: {temp_dir}")
-
-    # Add headless mode
-    if headless:
-        cmd.append("--headless=new")
-        logger.debug("Headless mode enabled")
-
-    # Add extra args
-    if extra_args:
-        cmd.extend(extra_args.split())
-        logger.debug(f"Extra args: {extra_args}")
-
-    logger.info(f"Launching Chrome with command: {' '.join(cmd)}")
-
-    try:
-        # Launch Chrome
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            start_new_session=True
-        )
-
-        logger.info(f"Chrome process started with PID: {process.pid}")
-
-        # Wait a bit for Chrome to start
-        logger.debug("Waiting 2 seconds for Chrome to initialize...")
-        await asyncio.sleep(2)
-
-        # Auto-generate connection ID if needed
-        if connection_id == "auto":
-            connection_id = f"chrome-{debug_port}"
-            logger.debug(f"Auto-generated connection ID: {connection_id}")
-
-        # Connect to the launched instance
-        try:
-            logger.info(f"Attempting to connect to Chrome at localhost:{debug_port} with connection_id={connection_id}")
-            await chrome_client.cdp_manager.connect(connection_id, "localhost", debug_port)
-            success_msg = f"✓ Chrome launched successfully\n\nProcess ID: {process.pid}\nDebug Port: {debug_port}\nConnection ID: {connection_id}\n\nUse chrome_list_connections() to see all connections."
-            logger.info(f"✓ Successfully connected to Chrome (PID: {process.pid}, port: {debug_port})")
-            return success_msg
-        except Exception as e:
-            error_msg = f"⚠️  Chrome launched (PID: {process.pid}) but connection failed: {e}\n\nTry chrome_connect({debug_port}, \"{connection_id}\") manually after a few seconds."
-            logger.warning(f"Chrome launched but connection failed: {e}")
-            return error_msg
-
-    except Exception as e:
-        error_msg = f"Error launching Chrome: {str(e)}"
-        logger.error(error_msg, exc_info=True)
+    # Connect to the launched instance
+    try:
+        logger.info(f"Attempting to connect to Chrome at localhost:{debug_port} with connection_id={connection_id}")
+        await chrome_client.cdp_manager.connect(connection_id, "localhost", debug_port)
+        chrome_client.invalidate_sessions()
+        success_msg = f"✓ Chrome launched successfully\n\nProcess ID: {process.pid}\nDebug Port: {debug_port}\nConnection ID: {connection_id}\n\nUse chrome_list_connections() to see all connections."
+        logger.info(f"✓ Successfully connected to Chrome (PID: {process.pid}, port: {debug_port})")
+        return success_msg
+    except Exception as e:
+        error_msg = f"⚠️  Chrome launched (PID: {process.pid}) but connection failed: {e}\n\nTry chrome_connect({debug_port}, \"{connection_id}\") manually after a few seconds."
+        logger.warning(f"Chrome launched but connection failed: {e}")
         return error_msg
 
 
@@ -895,6 +1541,7 @@ async def chrome_switch_connection(connection_id: str) -> str:
     await ensure_chrome_client()
 
     result = chrome_client.cdp_manager.switch_active(connection_id)
+    chrome_client.invalidate_sessions()
     return result
 
 
@@ -915,6 +1562,7 @@ async def chrome_disconnect(connection_id: str) -> str:
     await ensure_chrome_client()
 
     try:
+        chrome_client.invalidate_sessions()
         result = await chrome_client.cdp_manager.disconnect(connection_id)
         return result
     except Exception as e:
@@ -925,8 +1573,405 @@ async def chrome_disconnect(connection_id: str) -> str:
 # DOM Interaction Tools
 #
 
+# Simple selector shapes that map onto a dedicated DOM getter
+_ID_RE = re.compile(r"#([A-Za-z_][\w-]*)", re.ASCII)
+_CLASS_RE = re.compile(r"\.([A-Za-z_][\w-]*)", re.ASCII)
+_TAG_RE = re.compile(r"[A-Za-z][A-Za-z0-9-]*")
+
+
+@functools.lru_cache(maxsize=512)
+def _compile_selector(selector: str) -> Optional[Tuple[str, str]]:
+    """
+    Pick the DOM getter for a selector, once per distinct selector.
+
+    Returns:
+        (method, argument) for plain #id, .class and tag selectors, which the
+        page calls as document[method](argument); None for anything that
+        needs querySelectorAll
+    """
+    if m := _ID_RE.fullmatch(selector):
+        return ("getElementById", m[1])
+    if m := _CLASS_RE.fullmatch(selector):
+        return ("getElementsByClassName", m[1])
+    if _TAG_RE.fullmatch(selector):
+        return ("getElementsByTagName", selector)
+    return None
+
+
+# Page-side helpers shared by the DOM ops
+_DOM_HELPERS_JS = r"""
+// Elements for selectors fetched together by prefetchQueries (null = no cache)
+let selectCache = null;
+
+// Resolve a selector to an array-like list of elements in document order
+// (callers only read .length and [index]). `lookup` is the [method, argument]
+// pair from _compile_selector for plain #id, .class and tag selectors, which
+// skips the CSS selector engine; their live collections are returned as-is,
+// without copying into an array. Otherwise it is null and querySelectorAll
+// is used. getElementById only answers the common miss: pages do repeat ids,
+// and a hit goes through querySelectorAll so every duplicate is seen.
+function selectAll(selector, lookup) {
+    if (selectCache !== null && selectCache.has(selector)) {
+        return selectCache.get(selector);
+    }
+    if (lookup !== null) {
+        const [method, argument] = lookup;
+        if (method === 'getElementById') {
+            return document.getElementById(argument) ? document.querySelectorAll(selector) : [];
+        }
+        return document[method](argument);
+    }
+    return document.querySelectorAll(selector);
+}
+
+// Fetch the elements for the run of query ops starting at batch[start] with
+// one querySelectorAll over the :is()-joined selectors, then bucket them per
+// selector with matches(). Simple selectors already have fast paths, and
+// invalid ones are left out so selectAll still raises their error.
+function prefetchQueries(batch, start) {
+    selectCache = new Map();
+    const selectors = new Set();
+    for (let i = start; i < batch.length && batch[i].op === 'query'; i++) {
+        const [selector, lookup] = batch[i].args;
+        if (lookup !== null) {
+            continue;
+        }
+        try {
+            document.documentElement.matches(selector);
+            selectors.add(selector);
+        } catch (e) {}
+    }
+    if (selectors.size < 2) {
+        return;
+    }
+
+    const fused = Array.from(selectors);
+    try {
+        const buckets = fused.map(() => []);
+        const all = document.querySelectorAll(fused.map(s => `:is(${s})`).join(','));
+        for (const el of all) {
+            for (let i = 0; i < fused.length; i++) {
+                if (el.matches(fused[i])) {
+                    buckets[i].push(el);
+                }
+            }
+        }
+        fused.forEach((s, i) => selectCache.set(s, buckets[i]));
+    } catch (e) {
+        // Fall back to one querySelectorAll per selector
+        selectCache.clear();
+    }
+}
+
+// Python repr() of a string, so formatted output matches the old
+// Python-side formatting of attribute dicts
+function pyRepr(value) {
+    if (typeof value !== 'string') {
+        return String(value);
+    }
+    const quote = value.includes("'") && !value.includes('"') ? '"' : "'";
+    let out = quote;
+    for (const ch of value) {
+        const code = ch.codePointAt(0);
+        if (ch === '\\' || ch === quote) {
+            out += '\\' + ch;
+        } else if (ch === '\n') {
+            out += '\\n';
+        } else if (ch === '\r') {
+            out += '\\r';
+        } else if (ch === '\t') {
+            out += '\\t';
+        } else if (ch !== ' ' && /[\p{C}\p{Z}]/u.test(ch)) {
+            out += code <= 0xff ? '\\x' + code.toString(16).padStart(2, '0')
+                : code <= 0xffff ? '\\u' + code.toString(16).padStart(4, '0')
+                : '\\U' + code.toString(16).padStart(8, '0');
+        } else {
+            out += ch;
+        }
+    }
+    return out + quote;
+}
+
+// Render the query_elements report for a query op result, stopping once it
+// passes `budget` characters: check_result_size rejects anything that
+// large, so the rest would never be shown
+function formatQuery(selector, limit, result, budget) {
+    if (result.found === 0) {
+        return `No elements found matching selector: ${selector}`;
+    }
+
+    const lines = [];
+    let size = 0;
+    function add(line) {
+        lines.push(line);
+        size += line.length + 1;
+    }
+
+    if (result.filteredByDepth > 0) {
+        add(`Found ${result.found} element(s) matching '${selector}'`);
+        add(`Filtered out ${result.filteredByDepth} deeply nested element(s) (depth > ${result.maxDepth})`);
+        add(`Showing first ${Math.min(result.foundAfterDepthFilter, limit)} of ${result.foundAfterDepthFilter} remaining:`);
+    } else {
+        add(`Found ${result.found} element(s) matching '${selector}' (showing first ${Math.min(result.found, limit)}):`);
+    }
+    add('');
+
+    for (const el of result.elements) {
+        add(`[${el.index}] <${el.tag}> (depth: ${el.depth})`);
+        if (el.id) {
+            add(`    ID: #${el.id}`);
+        }
+        if (el.classes.length > 0) {
+            add(`    Classes: ${el.classes.join(', ')}`);
+        }
+        if (el.text) {
+            add(`    Text: ${el.text}`);
+        }
+        const attrs = [];
+        for (const [key, value] of Object.entries(el.attributes)) {
+            if (value !== null) {
+                attrs.push(`'${key}': ${pyRepr(value)}`);
+            }
+        }
+        if (attrs.length > 0) {
+            add(`    Attributes: {${attrs.join(', ')}}`);
+        }
+        add(`    Visible: ${el.visible ? 'True' : 'False'}`);
+        if (el.position) {
+            const pos = el.position;
+            add(`    Position: x=${pos.x}, y=${pos.y}, width=${pos.width}, height=${pos.height}`);
+        }
+
+        // Show inline elision message if this element has children that were filtered
+        if (el.childInfo) {
+            const direct = el.childInfo.directChildren;
+            const total = el.childInfo.totalDescendants;
+            add(`    [ELIDED ${direct} DIRECT CHILD ELEMENT${direct !== 1 ? 'S' : ''} (${total} element${total !== 1 ? 's' : ''} total). INCREASE SELECTOR SPECIFICITY]`);
+        }
+
+        add('');
+        if (size > budget) {
+            break;
+        }
+    }
+    return lines.join('\n');
+}
+"""
+
+# Page-side implementations of the DOM tools, keyed by op name.
+# Parameters arrive as JSON values, so selectors and text need no escaping.
+_DOM_OPS_JS = r"""{
+    query(selector, lookup, limit, maxDepth, includePos, includeVisible, budget) {
+        // Total matches anywhere in the document
+        const found = selectAll(selector, lookup).length;
+
+        // Walk the tree in document order, never descending past maxDepth, so
+        // depths come from the walk instead of a parent climb. Depth restarts
+        // at 0 on body; outside body (html, head and its children) it counts
+        // ancestors up to the root (html = 1). The root is always descended
+        // so body is reached whatever maxDepth is.
+        // Records are built in place into an array sized for the most we can
+        // keep and trimmed after the walk; the walk stack is two parallel
+        // arrays rather than pairs.
+        const elements = new Array(limit);
+        const readLayout = includePos || includeVisible;
+        const matchedNodes = readLayout ? new Array(elements.length) : null;
+        let kept = 0;
+        let foundAfterDepthFilter = 0;
+        const root = document.documentElement;
+        const body = document.body;
+        const nodes = root ? [root] : [];
+        const depths = root ? [1] : [];
+        while (nodes.length > 0) {
+            const el = nodes.pop();
+            const walked = depths.pop();
+            const depth = el === body ? 0 : walked;
+            if (depth <= maxDepth && el.matches(selector)) {
+                foundAfterDepthFilter++;
+                if (kept < elements.length) {
+                    // If this element is at max depth, count its children
+                    let childInfo = null;
+                    if (depth === maxDepth && el.children.length > 0) {
+                        childInfo = {
+                            directChildren: el.children.length,
+                            // Native count of every descendant element, no JS recursion
+                            totalDescendants: el.getElementsByTagName('*').length
+                        };
+                    }
+
+                    elements[kept] = {
+                        index: kept,
+                        selector: selector,
+                        tag: el.tagName.toLowerCase(),
+                        text: el.textContent.trim().substring(0, 100),
+                        id: el.id || null,
+                        classes: el.className ? el.className.split(' ').filter(c => c) : [],
+                        // Attribute-only check; offsetParent is read below when asked
+                        visible: !el.hidden && !el.hasAttribute('hidden'),
+                        depth: depth,
+                        childInfo: childInfo,
+                        position: null,
+                        attributes: {
+                            type: el.type || null,
+                            name: el.name || null,
+                            placeholder: el.placeholder || null,
+                            value: el.value !== undefined ? el.value.substring(0, 100) : null
+                        }
+                    };
+                    if (readLayout) {
+                        matchedNodes[kept] = el;
+                    }
+                    kept++;
+                }
+            }
+            if (depth < maxDepth || el === root) {
+                const children = el.children;
+                for (let i = children.length - 1; i >= 0; i--) {
+                    nodes.push(children[i]);
+                    depths.push(depth + 1);
+                }
+            }
+        }
+        elements.length = kept;
+
+        // Read layout only when asked, in one pass after all matching
+        if (readLayout) {
+            for (let i = 0; i < kept; i++) {
+                const node = matchedNodes[i];
+                if (includeVisible) {
+                    elements[i].visible = node.offsetParent !== null;
+                }
+                if (includePos) {
+                    const rect = node.getBoundingClientRect();
+                    elements[i].position = {
+                        x: Math.round(rect.x),
+                        y: Math.round(rect.y),
+                        width: Math.round(rect.width),
+                        height: Math.round(rect.height)
+                    };
+                }
+            }
+        }
+
+        const result = {
+            found: found,
+            foundAfterDepthFilter: foundAfterDepthFilter,
+            filteredByDepth: found - foundAfterDepthFilter,
+            maxDepth: maxDepth,
+            elements: elements
+        };
+
+        // Return the finished report, plus only the fields
+        // analyze_query_elements_data needs for oversized results. An
+        // over-budget report may have been cut short, so its length is only
+        // a lower bound on the real size (`partial`).
+        const text = formatQuery(selector, limit, result, budget);
+        return {
+            text: text,
+            meta: {
+                found: found,
+                partial: text.length > budget,
+                elements: elements.map(el => ({ tag: el.tag, id: el.id, classes: el.classes }))
+            }
+        };
+    },
+
+    click(selector, lookup, index) {
+        const elements = selectAll(selector, lookup);
+        if (elements.length === 0) {
+            return { success: false, error: 'No elements found matching selector' };
+        }
+        if (index >= elements.length) {
+            return { success: false, error: `Only ${elements.length} element(s) found, index ${index} out of range` };
+        }
+
+        const element = elements[index];
+        element.click();
+
+        return {
+            success: true,
+            clicked: `<${element.tagName.toLowerCase()}> at index ${index}`,
+            text: element.textContent.trim().substring(0, 50)
+        };
+    },
+
+    fill(selector, lookup, index, text, submit) {
+        const elements = selectAll(selector, lookup);
+        if (elements.length === 0) {
+            return { success: false, error: 'No elements found matching selector' };
+        }
+        if (index >= elements.length) {
+            return { success: false, error: `Only ${elements.length} element(s) found, index ${index} out of range` };
+        }
+
+        const element = elements[index];
+
+        // Set value
+        element.value = text;
+
+        // Trigger input event
+        element.dispatchEvent(new Event('input', { bubbles: true }));
+        element.dispatchEvent(new Event('change', { bubbles: true }));
+
+        // Submit if requested
+        if (submit) {
+            element.dispatchEvent(new KeyboardEvent('keypress', { key: 'Enter', code: 'Enter', keyCode: 13, bubbles: true }));
+        }
+
+        return {
+            success: true,
+            filled: `<${element.tagName.toLowerCase()}> at index ${index}`,
+            type: element.type || 'text'
+        };
+    }
+}"""
+
+# Identifies this build of the page-side bundle, so a page still holding a
+# bundle from an older server gets it replaced
+_DOM_BUNDLE_VERSION = format(zlib.crc32((_DOM_HELPERS_JS + _DOM_OPS_JS).encode()), "08x")
+
+# Installs window.__mcp, whose run() executes a batch of [{op, args}] against
+# _DOM_OPS_JS and returns one {ok, value|error} per op.
+# Consecutive query ops share one prefetched selector lookup; any other op
+# may mutate the page, so it drops the prefetched elements first.
+_DOM_BUNDLE_JS = """Object.defineProperty(window, '__mcp', {configurable: true, value: (() => {
+%s
+const ops = %s;
+return {
+    version: %s,
+    run(batch) {
+        selectCache = null;
+        return batch.map((o, i) => {
+            try {
+                if (o.op !== 'query') {
+                    selectCache = null;
+                } else if (selectCache === null) {
+                    prefetchQueries(batch, i);
+                }
+                return {ok: true, value: ops[o.op](...o.args)};
+            } catch (e) {
+                return {ok: false, error: String(e)};
+            }
+        });
+    }
+};
+})()});""" % (_DOM_HELPERS_JS, _DOM_OPS_JS, json.dumps(_DOM_BUNDLE_VERSION))
+
+# Runs a batch against an installed bundle; answers {__mcpMissing: true} when
+# the page has none (first use, or a navigation cleared it)
+_DOM_CALL_SCRIPT_TMPL = (
+    "(() => {"
+    "const mcp = window.__mcp;"
+    "return mcp && mcp.version === " + json.dumps(_DOM_BUNDLE_VERSION) + " ? mcp.run(%s) : {__mcpMissing: true};"
+    "})()"
+)
+
+# Installs the bundle, then runs a batch with it
+_DOM_INSTALL_SCRIPT_TMPL = "(() => {%s\nreturn window.__mcp.run(%s);})()"
+
+
 @mcp.tool()
-async def query_elements(selector: str, limit: int = 20, max_depth: Optional[int] = None, connection_id: Optional[str] = None) -> str:
+async def query_elements(selector: str, limit: int = 20, max_depth: Optional[int] = None, include_position: bool = False, include_visible: bool = False, connection_id: Optional[str] = None) -> str:
     """
     Find elements by CSS selector and return their details.
 
@@ -945,178 +1990,39 @@ async def query_elements(selector: str, limit: int = 20, max_depth: Optional[int
     - query_elements(".login-form input") - Find inputs in login form
     - query_elements("#username") - Find element with id="username"
     - query_elements("div", max_depth=8) - Include deeper divs (max 10)
+    - query_elements("button", include_position=True) - Also show bounding boxes
+    - query_elements("button", include_visible=True) - Check rendered visibility
 
     Args:
         selector: CSS selector to query (e.g., ".class", "#id", "button")
         limit: Maximum number of elements to return (default: 20)
         max_depth: Maximum DOM depth from body (default: 3, hard limit: 10)
+        include_position: Include each element's bounding box (default: False, forces a layout)
+        include_visible: Report rendered visibility via offsetParent (default: False, forces a layout);
+            otherwise Visible only reflects the hidden attribute
         connection_id: Chrome connection to use (uses default if not specified)
 
     """
     await ensure_chrome_client()
 
     try:
-        # Use configured max depth if not specified
-        if max_depth is None:
-            max_depth = MAX_DOM_DEPTH
-
-        # Enforce hard limit
-        if max_depth > HARD_MAX_DOM_DEPTH:
-            max_depth = HARD_MAX_DOM_DEPTH
+        # Use configured max depth if not specified, enforce hard limit
+        max_depth = clamp_dom_depth(max_depth)
+        # A negative limit would size the page-side record array below zero
+        limit = max(0, limit)
 
-        # Escape single quotes in selector
-        escaped_selector = selector.replace("'", "\\'")
-
-        script = f"""
-        (() => {{
-            const maxDepth = {max_depth};
-
-            // Calculate depth from body
-            function getDepth(el) {{
-                let depth = 0;
-                let current = el;
-                while (current && current !== document.body) {{
-                    depth++;
-                    current = current.parentElement;
-                }}
-                return depth;
-            }}
-
-            // Count total descendants
-            function countDescendants(el) {{
-                let count = 0;
-                function countRecursive(node) {{
-                    for (const child of node.children) {{
-                        count++;
-                        countRecursive(child);
-                    }}
-                }}
-                countRecursive(el);
-                return count;
-            }}
+        # The page formats the report; meta carries the fields used to
+        # suggest narrower selectors when the report is too large
+        data = await chrome_client.run_dom_op("query", selector, _compile_selector(selector), limit, max_depth, include_position, include_visible, MAX_RESULT_SIZE, connection_id=connection_id)
 
-            // Get all matching elements
-            const allElements = Array.from(document.querySelectorAll('{escaped_selector}'));
-
-            // Filter by depth
-            const elementsWithDepth = allElements.map(el => ({{
-                element: el,
-                depth: getDepth(el)
-            }}));
-
-            const filteredElements = elementsWithDepth.filter(item => item.depth <= maxDepth);
-            const filtered = allElements.length - filteredElements.length;
-
-            // Apply limit and extract data
-            const limit = {limit};
-            const limitedElements = filteredElements.slice(0, limit);
-
-            return {{
-                found: allElements.length,
-                foundAfterDepthFilter: filteredElements.length,
-                filteredByDepth: filtered,
-                maxDepth: maxDepth,
-                elements: limitedElements.map((item, idx) => {{
-                    const el = item.element;
-                    const rect = el.getBoundingClientRect();
-
-                    // If this element is at max depth, count its children
-                    let childInfo = null;
-                    if (item.depth === maxDepth && el.children.length > 0) {{
-                        childInfo = {{
-                            directChildren: el.children.length,
-                            totalDescendants: countDescendants(el)
-                        }};
-                    }}
-
-                    return {{
-                        index: idx,
-                        selector: '{escaped_selector}',
-                        tag: el.tagName.toLowerCase(),
-                        text: el.textContent.trim().substring(0, 100),
-                        id: el.id || null,
-                        classes: el.className ? el.className.split(' ').filter(c => c) : [],
-                        visible: el.offsetParent !== null,
-                        depth: item.depth,
-                        childInfo: childInfo,
-                        position: {{
-                            x: Math.round(rect.x),
-                            y: Math.round(rect.y),
-                            width: Math.round(rect.width),
-                            height: Math.round(rect.height)
-                        }},
-                        attributes: {{
-                            type: el.type || null,
-                            name: el.name || null,
-                            placeholder: el.placeholder || null,
-                            value: el.value !== undefined ? el.value.substring(0, 100) : null
-                        }}
-                    }};
-                }})
-            }};
-        }})()
-        """
-
-        result = await chrome_client.evaluate(script)
-
-        # Parse the JSON result
-        try:
-            data = json.loads(result)
-            if data.get('found', 0) == 0:
-                return f"No elements found matching selector: {selector}"
-
-            # Build output header
-            found_total = data['found']
-            found_filtered = data['foundAfterDepthFilter']
-            filtered_count = data['filteredByDepth']
-            max_depth_used = data['maxDepth']
-
-            if filtered_count > 0:
-                output = [f"Found {found_total} element(s) matching '{selector}'"]
-                output.append(f"Filtered out {filtered_count} deeply nested element(s) (depth > {max_depth_used})")
-                output.append(f"Showing first {min(found_filtered, limit)} of {found_filtered} remaining:")
-            else:
-                output = [f"Found {found_total} element(s) matching '{selector}' (showing first {min(found_total, limit)}):"]
-
-            output.append("")
-
-            for el in data.get('elements', []):
-                depth_info = f" (depth: {el['depth']})" if el.get('depth') is not None else ""
-                output.append(f"[{el['index']}] <{el['tag']}>{depth_info}")
-                if el.get('id'):
-                    output.append(f"    ID: #{el['id']}")
-                if el.get('classes'):
-                    output.append(f"    Classes: {', '.join(el['classes'])}")
-                if el.get('text'):
-                    output.append(f"    Text: {el['text']}")
-                if el.get('attributes'):
-                    attrs = el['attributes']
-                    relevant_attrs = {k: v for k, v in attrs.items() if v is not None}
-                    if relevant_attrs:
-                        output.append(f"    Attributes: {relevant_attrs}")
-                output.append(f"    Visible: {el['visible']}")
-
-                # Show inline elision message if this element has children that were filtered
-                if el.get('childInfo'):
-                    child_info = el['childInfo']
-                    direct = child_info['directChildren']
-                    total = child_info['totalDescendants']
-                    output.append(f"    [ELIDED {direct} DIRECT CHILD ELEMENT{'S' if direct != 1 else ''} ({total} element{'s' if total != 1 else ''} total). INCREASE SELECTOR SPECIFICITY]")
-
-                output.append("")
-
-            # No need for generic tip - inline elision messages are more specific
-
-            return check_result_size("\n".join(output), context="query_elements", analysis_data=data)
-        except json.JSONDecodeError:
-            return check_result_size(result, context="query_elements")
+        return check_result_size(data['text'], context="query_elements", analysis_data=data['meta'])
 
     except Exception as e:
         return f"Error querying elements: {str(e)}"
 
 
 @mcp.tool()
-async def click_element(selector: str, index: int = 0, connection_id: Optional[str] = None) -> str:
+async def click_element(selector: str, index: int = 0, prefer_native: bool = False, connection_id: Optional[str] = None) -> str:
     """
     Click an element matching the CSS selector.
 
@@ -1125,69 +2031,51 @@ async def click_element(selector: str, index: int = 0, connection_id: Optional[s
     Examples:
     - click_element("button.submit") - Click first submit button
     - click_element(".item", index=2) - Click third element with class "item"
+    - click_element("button.submit", prefer_native=True) - Click via the native tool
 
     Args:
         selector: CSS selector for the element to click
         index: Which matching element to click if multiple exist (default: 0 = first)
+        prefer_native: Resolve the element's snapshot ref and use the native click tool
+            (default: False = one JavaScript round-trip)
         connection_id: Chrome connection to use (uses default if not specified)
 
     """
     await ensure_chrome_client()
 
     try:
-        # Try to get element ref for native tool
-        ref, debug_info = await chrome_client.find_element_ref(selector, index)
-
-        if ref:
-            # Use native Chrome DevTools click tool
-            try:
-                result = await chrome_client.call_tool("click", {"elementRef": ref})
-                return f"✓ Clicked {debug_info}"
-            except Exception as e:
-                # Fall back to JavaScript if native tool fails
-                if DEBUG:
-                    print(f"Native click failed, falling back to JavaScript: {e}")
+        # The native path costs a mark, snapshot and tool call, so it is opt-in.
+        # Native tools act on the MCP server's page, so an explicit
+        # connection always goes straight to JavaScript over CDP
+        if prefer_native and connection_id is None:
+            # Try to get element ref for native tool
+            ref, debug_info = await chrome_client.find_element_ref(selector, index)
 
-        # Fallback: Use JavaScript click
-        escaped_selector = selector.replace("'", "\\'")
-        script = f"""
-        (() => {{
-            const elements = document.querySelectorAll('{escaped_selector}');
-            if (elements.length === 0) {{
-                return {{ success: false, error: 'No elements found matching selector' }};
-            }}
-            if ({index} >= elements.length) {{
-                return {{ success: false, error: `Only ${{elements.length}} element(s) found, index {index} out of range` }};
-            }}
-
-            const element = elements[{index}];
-            element.click();
-
-            return {{
-                success: true,
-                clicked: `<${{element.tagName.toLowerCase()}}> at index {index}`,
-                text: element.textContent.trim().substring(0, 50)
-            }};
-        }})()
-        """
-
-        result = await chrome_client.evaluate(script)
-
-        try:
-            data = json.loads(result)
-            if data.get('success'):
-                return f"✓ Clicked {data['clicked']}: {data.get('text', '')}"
-            else:
-                return f"✗ Failed: {data.get('error', 'Unknown error')}"
-        except json.JSONDecodeError:
-            return result
+            if ref:
+                # Use native Chrome DevTools click tool
+                try:
+                    result = await chrome_client.call_tool("click", {"elementRef": ref})
+                    chrome_client.invalidate_snapshot()
+                    return f"✓ Clicked {debug_info}"
+                except Exception as e:
+                    # Fall back to JavaScript if native tool fails
+                    logger.debug("Native click failed, falling back to JavaScript: %s", e)
+
+        # Use JavaScript click (default, or fallback from the native path)
+        data = await chrome_client.run_dom_op("click", selector, _compile_selector(selector), index, connection_id=connection_id)
+        chrome_client.invalidate_snapshot()
+
+        if data.get('success'):
+            return f"✓ Clicked {data['clicked']}: {data.get('text', '')}"
+        else:
+            return f"✗ Failed: {data.get('error', 'Unknown error')}"
 
     except Exception as e:
         return f"Error clicking element: {str(e)}"
 
 
 @mcp.tool()
-async def fill_element(selector: str, text: str, index: int = 0, submit: bool = False, connection_id: Optional[str] = None) -> str:
+async def fill_element(selector: str, text: str, index: int = 0, submit: bool = False, prefer_native: bool = False, connection_id: Optional[str] = None) -> str:
     """
     Fill text into an input element matching the CSS selector.
 
@@ -1203,82 +2091,50 @@ async def fill_element(selector: str, text: str, index: int = 0, submit: bool =
         text: Text to enter into the field
         index: Which matching element to fill if multiple exist (default: 0 = first)
         submit: Whether to press Enter after filling (default: False)
+        prefer_native: Resolve the element's snapshot ref and use the native fill tool
+            (default: False = fill and submit in one JavaScript round-trip)
         connection_id: Chrome connection to use (uses default if not specified)
 
     """
     await ensure_chrome_client()
 
     try:
-        # Try to get element ref for native tool
-        ref, debug_info = await chrome_client.find_element_ref(selector, index)
-
-        if ref:
-            # Use native Chrome DevTools fill tool
-            try:
-                result = await chrome_client.call_tool("fill", {
-                    "elementRef": ref,
-                    "value": text
-                })
-
-                # Handle submit if requested
-                if submit:
-                    # Press Enter using keyboard
-                    await chrome_client.call_tool("press_key", {"key": "Enter"})
-                    return f"✓ Filled {debug_info} and submitted"
-
-                return f"✓ Filled {debug_info}"
-            except Exception as e:
-                # Fall back to JavaScript if native tool fails
-                if DEBUG:
-                    print(f"Native fill failed, falling back to JavaScript: {e}")
-
-        # Fallback: Use JavaScript
-        escaped_selector = selector.replace("'", "\\'")
-        escaped_text = text.replace("'", "\\'").replace("\n", "\\n")
+        # The native path costs a mark, snapshot and tool call, so it is opt-in.
+        # Native tools act on the MCP server's page, so an explicit
+        # connection always goes straight to JavaScript over CDP
+        if prefer_native and connection_id is None:
+            # Try to get element ref for native tool
+            ref, debug_info = await chrome_client.find_element_ref(selector, index)
 
-        script = f"""
-        (() => {{
-            const elements = document.querySelectorAll('{escaped_selector}');
-            if (elements.length === 0) {{
-                return {{ success: false, error: 'No elements found matching selector' }};
-            }}
-            if ({index} >= elements.length) {{
-                return {{ success: false, error: `Only ${{elements.length}} element(s) found, index {index} out of range` }};
-            }}
-
-            const element = elements[{index}];
-
-            // Set value
-            element.value = '{escaped_text}';
-
-            // Trigger input event
-            element.dispatchEvent(new Event('input', {{ bubbles: true }}));
-            element.dispatchEvent(new Event('change', {{ bubbles: true }}));
-
-            // Submit if requested
-            if ({str(submit).lower()}) {{
-                element.dispatchEvent(new KeyboardEvent('keypress', {{ key: 'Enter', code: 'Enter', keyCode: 13, bubbles: true }}));
-            }}
-
-            return {{
-                success: true,
-                filled: `<${{element.tagName.toLowerCase()}}> at index {index}`,
-                type: element.type || 'text'
-            }};
-        }})()
-        """
-
-        result = await chrome_client.evaluate(script)
-
-        try:
-            data = json.loads(result)
-            if data.get('success'):
-                submit_msg = " and submitted" if submit else ""
-                return f"✓ Filled {data['filled']} ({data['type']}){submit_msg}"
-            else:
-                return f"✗ Failed: {data.get('error', 'Unknown error')}"
-        except json.JSONDecodeError:
-            return result
+            if ref:
+                # Use native Chrome DevTools fill tool
+                try:
+                    result = await chrome_client.call_tool("fill", {
+                        "elementRef": ref,
+                        "value": text
+                    })
+                    chrome_client.invalidate_snapshot()
+
+                    # Handle submit if requested
+                    if submit:
+                        # Press Enter using keyboard
+                        await chrome_client.call_tool("press_key", {"key": "Enter"})
+                        return f"✓ Filled {debug_info} and submitted"
+
+                    return f"✓ Filled {debug_info}"
+                except Exception as e:
+                    # Fall back to JavaScript if native tool fails
+                    logger.debug("Native fill failed, falling back to JavaScript: %s", e)
+
+        # Use JavaScript (default, or fallback from the native path)
+        data = await chrome_client.run_dom_op("fill", selector, _compile_selector(selector), index, text, submit, connection_id=connection_id)
+        chrome_client.invalidate_snapshot()
+
+        if data.get('success'):
+            submit_msg = " and submitted" if submit else ""
+            return f"✓ Filled {data['filled']} ({data['type']}){submit_msg}"
+        else:
+            return f"✗ Failed: {data.get('error', 'Unknown error')}"
 
     except Exception as e:
         return f"Error filling element: {str(e)}"
@@ -1309,6 +2165,51 @@ async def _execute_script(script: str) -> str:
         return f"Error executing script: {str(e)}"
 
 
+# Severity of Runtime.consoleAPICalled types (lower is more severe); types not
+# listed here (dir, table, trace, ...) count as info
+_CONSOLE_SEVERITY = {"error": 0, "assert": 0, "warning": 1, "info": 2, "log": 2, "debug": 3}
+_CONSOLE_FILTER_SEVERITY = {"all": 3, "error": 0, "warning": 1, "info": 2, "debug": 3}
+
+
+def _format_console_log(cdp: CDPClient, filter_level: str) -> str:
+    """Render a CDP connection's buffered console messages at or above filter_level"""
+    max_severity = _CONSOLE_FILTER_SEVERITY.get(filter_level)
+    if max_severity is None:
+        return f"Error: filter_level must be 'all', 'error', 'warning', 'info' or 'debug' (got '{filter_level}')"
+    lines = [
+        f"[{kind}] {text}"
+        for kind, text in cdp.console_log
+        if _CONSOLE_SEVERITY.get(kind, 2) <= max_severity
+    ]
+    if not lines:
+        return "No console messages."
+    return f"Console messages ({len(lines)}):\n" + "\n".join(lines)
+
+
+def _format_network_log(cdp: CDPClient, filter_status: Optional[str]) -> str:
+    """Render a CDP connection's buffered network responses matching filter_status"""
+    entries = cdp.network_log
+    if filter_status:
+        pattern = filter_status.lower()
+        if pattern == "failed":
+            entries = [e for e in entries if e[3] is not None]
+        elif len(pattern) == 3 and pattern.endswith("xx") and pattern[0].isdigit():
+            status_class = int(pattern[0])
+            entries = [e for e in entries if e[3] is None and e[0] // 100 == status_class]
+        elif pattern.isdigit():
+            status = int(pattern)
+            entries = [e for e in entries if e[3] is None and e[0] == status]
+        else:
+            return f"Error: filter_status must be a status code (e.g. '404'), a class (e.g. '5xx') or 'failed' (got '{filter_status}')"
+    lines = [
+        f"{status} {kind} {url}" if error is None else f"FAILED {kind} {url} ({error})"
+        for status, kind, url, error in entries
+    ]
+    if not lines:
+        return "No network requests."
+    return f"Network requests ({len(lines)}):\n" + "\n".join(lines)
+
+
 @mcp.tool()
 async def get_console_logs(filter_level: str = "all", connection_id: Optional[str] = None) -> str:
     """
@@ -1318,8 +2219,17 @@ async def get_console_logs(filter_level: str = "all", connection_id: Optional[st
 
     Args:
         filter_level: Filter by level - "all", "error", "warning", "info", or "debug"
-        connection_id: Chrome connection to use (uses default if not specified)
+        connection_id: CDP connection to read buffered messages from (default: the
+            DevTools MCP page)
     """
+    # An explicit CDP connection buffers its console events as they arrive. The
+    # default stays on the DevTools MCP page, like navigate and the DOM tools
+    if connection_id is not None:
+        cdp, error = await _resolve_cdp(connection_id)
+        if error:
+            return error
+        return check_result_size(_format_console_log(cdp, filter_level), context="console_logs")
+
     await ensure_chrome_client()
 
     try:
@@ -1328,11 +2238,7 @@ async def get_console_logs(filter_level: str = "all", connection_id: Optional[st
             {"filterLevel": filter_level}
         )
 
-        content = result.content if hasattr(result, 'content') else result
-        if isinstance(content, list) and len(content) > 0:
-            text_content = content[0].text if hasattr(content[0], 'text') else str(content[0])
-        else:
-            text_content = str(content)
+        text_content = _extract_text(result)
 
         return check_result_size(text_content, context="console_logs")
     except Exception as e:
@@ -1354,6 +2260,7 @@ async def navigate(url: str, connection_id: Optional[str] = None) -> str:
             "navigate_page",
             {"url": url}
         )
+        chrome_client.invalidate_snapshot()
 
         return f"✓ Navigated to {url}"
     except Exception as e:
@@ -1368,8 +2275,19 @@ async def get_network_requests(filter_status: Optional[str] = None, connection_i
     Use this to debug API calls and network issues.
 
     Args:
-        filter_status: Optional filter by HTTP status code (e.g., "200", "404", "5xx")
+        filter_status: Optional filter by HTTP status code (e.g., "200", "404", "5xx");
+            with connection_id, "failed" lists requests that failed to load
+        connection_id: CDP connection to read buffered requests from (default: the
+            DevTools MCP page)
     """
+    # An explicit CDP connection buffers its network responses as they arrive. The
+    # default stays on the DevTools MCP page, like navigate and the DOM tools
+    if connection_id is not None:
+        cdp, error = await _resolve_cdp(connection_id)
+        if error:
+            return error
+        return check_result_size(_format_network_log(cdp, filter_status), context="network_requests")
+
     await ensure_chrome_client()
 
     try:
@@ -1382,11 +2300,7 @@ async def get_network_requests(filter_status: Optional[str] = None, connection_i
             arguments
         )
 
-        content = result.content if hasattr(result, 'content') else result
-        if isinstance(content, list) and len(content) > 0:
-            text_content = content[0].text if hasattr(content[0], 'text') else str(content[0])
-        else:
-            text_content = str(content)
+        text_content = _extract_text(result)
 
         return check_result_size(text_content, context="network_requests")
     except Exception as e:
@@ -1408,6 +2322,90 @@ async def get_network_requests(filter_status: Optional[str] = None, connection_i
 # This forces proper debugging instead of random code execution.
 #
 
+# Fixed tool responses
+_MSG_ENABLED = (
+    "✓ Debugger enabled successfully\n\n"
+    "You can now:\n"
+    "- Set breakpoints with debugger_set_breakpoint()\n"
+    "- Pause execution with debugger_pause()\n"
+    "- Configure exception breaking with debugger_set_pause_on_exceptions()"
+)
+_MSG_ALREADY_ENABLED = "✓ Debugger already enabled"
+_MSG_NOT_PAUSED_STEP = "Not paused. Cannot step when execution is not paused."
+_MSG_STEP_OVER = "✓ Stepped over. Execution will pause at next line.\nUse debugger_get_call_stack() to see current location."
+_MSG_STEP_INTO = "✓ Stepped into function. Execution will pause at first line.\nUse debugger_get_call_stack() to see current location."
+_MSG_STEP_OUT = "✓ Stepped out of function. Execution will pause at caller.\nUse debugger_get_call_stack() to see current location."
+_MSG_RESUMED = "✓ Execution resumed. Will pause at next breakpoint or exception."
+_MSG_PAUSE_REQUESTED = "✓ Pause requested. Execution will pause at next statement.\nUse debugger_get_call_stack() once paused."
+
+
+def _failed_acks_note(cdp: CDPClient) -> str:
+    """Report step/resume/pause commands Chrome rejected since the last debugger call"""
+    errors = cdp.take_ack_errors()
+    if not errors:
+        return ""
+    return "⚠ An earlier command failed:\n" + "\n".join(errors) + "\n\n"
+
+
+# Distinct page-side counter slot for each hit_condition breakpoint
+_hit_counter_ids = itertools.count()
+
+
+def _with_hit_slot(info: BpInfo) -> BpInfo:
+    """Give a hit_condition breakpoint its own page-side counter slot"""
+    if not info.hit_condition:
+        return info
+    return info._replace(hit_slot=f"__mcpHits{next(_hit_counter_ids)}")
+
+
+def _breakpoint_condition(condition: Optional[str], hit_condition: Optional[int], hit_slot: Optional[str]) -> Optional[str]:
+    """
+    Build the CDP condition for a breakpoint.
+
+    The condition is passed to V8 as written (V8 already treats one that
+    throws as false). hit_condition adds a page-side counter (in hit_slot),
+    ANDed after the condition, so the breakpoint only pauses from its Nth
+    (condition-passing) hit on; the condition then has to be an expression.
+    """
+    if not (hit_condition and hit_slot):
+        return condition or None
+    counter = f"(globalThis.{hit_slot} = (globalThis.{hit_slot} || 0) + 1) >= {int(hit_condition)}"
+    if not condition:
+        return counter
+    # Newlines keep a trailing // comment in the condition off the counter
+    return f"(\n{condition}\n) && {counter}"
+
+
+async def _clear_hit_slots(cdp: CDPClient, infos: List[BpInfo]) -> None:
+    """Delete the page-side hit counters of removed breakpoints (best effort)"""
+    slots = [info.hit_slot for info in infos if info.hit_slot]
+    if not slots:
+        return
+    try:
+        await cdp.send_command("Runtime.evaluate", {
+            "expression": "; ".join(f"delete globalThis.{slot}" for slot in slots)
+        })
+    except Exception as e:
+        # A leftover counter only costs a global; the breakpoint itself is gone
+        logger.debug("Could not clear hit counters %s: %s", slots, e)
+
+
+def _breakpoint_params(info: BpInfo) -> dict:
+    """Build Debugger.setBreakpointByUrl params for a breakpoint"""
+    params = {
+        "url": info.url,
+        "lineNumber": info.line - 1  # CDP uses 0-indexed line numbers
+    }
+    # Column 0 is CDP's default, so only send a non-zero column
+    if info.col:
+        params["columnNumber"] = info.col
+
+    cdp_condition = _breakpoint_condition(info.condition, info.hit_condition, info.hit_slot)
+    if cdp_condition:
+        params["condition"] = cdp_condition
+    return params
+
+
 @mcp.tool()
 async def debugger_enable(connection_id: Optional[str] = None) -> str:
     """
@@ -1422,24 +2420,25 @@ async def debugger_enable(connection_id: Optional[str] = None) -> str:
     Returns:
         Success message with debugger status
     """
-    await ensure_chrome_client()
+    cdp, error = await _resolve_cdp(connection_id)
+    if error:
+        return error
 
-    cdp = chrome_client.cdp_manager.get_connection(connection_id)
-    if not cdp:
-        conn_msg = f" '{connection_id}'" if connection_id else ""
-        return f"Error: No Chrome connection{conn_msg} found. Use chrome_connect() or chrome_launch() first."
+    if cdp.debugger_enabled:
+        return _MSG_ALREADY_ENABLED
 
     try:
         # Enable the Debugger domain in CDP
         await cdp.send_command("Debugger.enable", {})
+        cdp.debugger_enabled = True
 
-        return "✓ Debugger enabled successfully\n\nYou can now:\n- Set breakpoints with debugger_set_breakpoint()\n- Pause execution with debugger_pause()\n- Configure exception breaking with debugger_set_pause_on_exceptions()"
+        return _MSG_ENABLED
     except Exception as e:
         return f"Error enabling debugger: {str(e)}"
 
 
 @mcp.tool()
-async def debugger_set_breakpoint(url: str, line_number: int, column_number: int = 0, condition: Optional[str] = None, connection_id: Optional[str] = None) -> str:
+async def debugger_set_breakpoint(url: str, line_number: int, column_number: int = 0, condition: Optional[str] = None, hit_condition: Optional[int] = None, connection_id: Optional[str] = None) -> str:
     """
     Set a breakpoint at a specific line in a source file.
 
@@ -1454,7 +2453,11 @@ async def debugger_set_breakpoint(url: str, line_number: int, column_number: int
         url: Full URL or path of the script (e.g., "http://localhost:3000/main.js" or "file:///src/app.js")
         line_number: Line number to break on (1-indexed)
         column_number: Column number (0-indexed, default: 0)
-        condition: Optional conditional expression (breakpoint only triggers if true)
+        condition: Optional conditional expression (breakpoint only triggers if true).
+            Evaluated by V8 on every hit, so keep it cheap on hot code; an
+            expression that throws counts as false
+        hit_condition: Optional N - only pause from the Nth hit on (counting hits
+            where condition passed); much cheaper than a counting condition
         connection_id: Chrome connection to use (uses default if not specified)
 
     Returns:
@@ -1463,58 +2466,126 @@ async def debugger_set_breakpoint(url: str, line_number: int, column_number: int
     Example:
         debugger_set_breakpoint("http://localhost:3000/app.js", 42)
         debugger_set_breakpoint("http://localhost:3000/app.js", 42, condition="user.id === 123")
+        debugger_set_breakpoint("http://localhost:3000/app.js", 42, hit_condition=100)
         debugger_set_breakpoint("app.js", 42, connection_id="staging")
     """
-    await ensure_chrome_client()
+    cdp, error = await _resolve_cdp(connection_id)
+    if error:
+        return error
+
+    info = BpInfo(url, line_number, column_number, condition, hit_condition)
 
-    cdp = chrome_client.cdp_manager.get_connection(connection_id)
-    if not cdp:
-        conn_msg = f" '{connection_id}'" if connection_id else ""
-        return f"Error: No Chrome connection{conn_msg} found. Use chrome_connect() or chrome_launch() first."
+    # Same breakpoint already set on this connection: reuse it
+    existing = cdp.bp_by_location.get(info)
+    if existing is not None:
+        return f"✓ Breakpoint already set\n\nBreakpoint ID: {existing}\nURL: {url}\nLine: {line_number}"
 
     try:
         # Set breakpoint using CDP
-        params = {
-            "url": url,
-            "lineNumber": line_number - 1,  # CDP uses 0-indexed line numbers
-            "columnNumber": column_number
-        }
-
-        if condition:
-            params["condition"] = condition
-
-        result = await cdp.send_command("Debugger.setBreakpointByUrl", params)
+        info = _with_hit_slot(info)
+        result = await cdp.send_command("Debugger.setBreakpointByUrl", _breakpoint_params(info))
 
         breakpoint_id = result.get("breakpointId")
         locations = result.get("locations", [])
 
         # Store breakpoint info
-        cdp.breakpoints[breakpoint_id] = {
-            "url": url,
-            "lineNumber": line_number,
-            "columnNumber": column_number,
-            "condition": condition
-        }
-
-        response = f"✓ Breakpoint set successfully\n\nBreakpoint ID: {breakpoint_id}\nURL: {url}\nLine: {line_number}"
-
-        if condition:
-            response += f"\nCondition: {condition}"
+        cdp.breakpoints[breakpoint_id] = info
+        cdp.bp_by_location[info.location] = breakpoint_id
 
+        cond_part = f"\nCondition: {condition}" if condition else ""
+        hit_part = f"\nHit condition: pauses from hit {hit_condition} on" if hit_condition else ""
+        loc_part = ""
         if locations:
             loc = locations[0]
             actual_line = loc.get("lineNumber", 0) + 1  # Convert back to 1-indexed
-            response += f"\n\nActual location: Line {actual_line}, Column {loc.get('columnNumber', 0)}"
+            loc_part = f"\n\nActual location: Line {actual_line}, Column {loc.get('columnNumber', 0)}"
 
-        response += "\n\nTrigger the code path to pause at this breakpoint."
-
-        return response
+        return (
+            f"✓ Breakpoint set successfully\n\nBreakpoint ID: {breakpoint_id}\nURL: {url}\nLine: {line_number}"
+            f"{cond_part}{hit_part}{loc_part}\n\nTrigger the code path to pause at this breakpoint."
+        )
     except Exception as e:
         return f"Error setting breakpoint: {str(e)}"
 
 
 @mcp.tool()
-async def debugger_get_call_stack(connection_id: Optional[str] = None) -> str:
+async def debugger_set_breakpoints(breakpoints: List[Dict[str, Any]], connection_id: Optional[str] = None) -> str:
+    """
+    Set several breakpoints at once.
+
+    The CDP commands are sent together and their replies awaited concurrently,
+    so setting N breakpoints costs about one round-trip instead of N.
+
+    Args:
+        breakpoints: List of breakpoint specs, each with "url" and "line_number"
+            (1-indexed) and optionally "column_number", "condition" and
+            "hit_condition" (as in debugger_set_breakpoint)
+        connection_id: Chrome connection to use (uses default if not specified)
+
+    Returns:
+        Breakpoint ID (or error) for each spec, in order
+
+    Example:
+        debugger_set_breakpoints([
+            {"url": "http://localhost:3000/app.js", "line_number": 42},
+            {"url": "http://localhost:3000/app.js", "line_number": 57, "condition": "x > 1"}
+        ])
+    """
+    cdp, error = await _resolve_cdp(connection_id)
+    if error:
+        return error
+
+    if not breakpoints:
+        return "Error: No breakpoints given"
+
+    try:
+        infos = []
+        for bp in breakpoints:
+            condition = bp.get("condition")
+            if condition is not None and not isinstance(condition, str):
+                raise TypeError(f"condition must be a string, got {type(condition).__name__}")
+            hit_condition = bp.get("hit_condition")
+            infos.append(BpInfo(
+                str(bp["url"]),
+                int(bp["line_number"]),
+                int(bp.get("column_number") or 0),
+                condition,
+                int(hit_condition) if hit_condition is not None else None
+            ))
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        return f"Error: each breakpoint needs 'url' and an integer 'line_number' ({e!r})"
+
+    # Breakpoints already set on this connection are reused, not re-sent
+    to_send = {info: _with_hit_slot(info) for info in dict.fromkeys(infos) if info not in cdp.bp_by_location}
+    results = await asyncio.gather(
+        *(cdp.send_command("Debugger.setBreakpointByUrl", _breakpoint_params(info)) for info in to_send.values()),
+        return_exceptions=True
+    )
+    sent = dict(zip(to_send, results))
+
+    added = {}
+    lines = []
+    for i, info in enumerate(infos):
+        result = sent.get(info)
+        if result is None:
+            lines.append(f"[{i}] {info.url}:{info.line} - Breakpoint ID: {cdp.bp_by_location[info]} (already set)")
+            continue
+        if isinstance(result, BaseException):
+            lines.append(f"[{i}] {info.url}:{info.line} - Error: {result}")
+            continue
+        breakpoint_id = result.get("breakpointId")
+        added[breakpoint_id] = to_send[info]
+        lines.append(f"[{i}] {info.url}:{info.line} - Breakpoint ID: {breakpoint_id}")
+
+    # Store breakpoint info
+    cdp.breakpoints.update(added)
+    cdp.bp_by_location.update((info.location, bp_id) for bp_id, info in added.items())
+
+    return f"✓ Set {len(added)} of {len(infos)} breakpoints\n\n" + "\n".join(lines)
+
+
+@mcp.tool()
+async def debugger_get_call_stack(max_frames: int = 32, connection_id: Optional[str] = None) -> str:
     """
     Get the current call stack when execution is paused.
 
@@ -1526,31 +2597,36 @@ async def debugger_get_call_stack(connection_id: Optional[str] = None) -> str:
     - Scope chain
     - Call frame ID (needed for debugger_evaluate_on_call_frame)
 
+    Args:
+        max_frames: Show at most this many innermost frames (default: 32, 0 for all);
+            the number of frames left out is reported
+        connection_id: Chrome connection to use (uses default if not specified)
+
     Returns:
         Call stack with frame details, or error if not paused
     """
-    await ensure_chrome_client()
-
-    cdp = chrome_client.cdp_manager.get_connection(connection_id)
-    if not cdp:
-        conn_msg = f" '{connection_id}'" if connection_id else ""
-        return f"Error: No Chrome connection{conn_msg} found. Use chrome_connect() or chrome_launch() first."
+    cdp, error = await _resolve_cdp(connection_id)
+    if error:
+        return error
 
+    note = _failed_acks_note(cdp)
     try:
         # Check if execution is paused
         if not cdp.paused_data:
-            return "Not paused. Set a breakpoint with debugger_set_breakpoint() and trigger it, or use debugger_pause() to pause execution."
+            return note + "Not paused. Set a breakpoint with debugger_set_breakpoint() and trigger it, or use debugger_pause() to pause execution."
 
         call_frames = cdp.paused_data.get("callFrames", [])
         reason = cdp.paused_data.get("reason", "unknown")
 
         if not call_frames:
-            return "Execution is paused but no call stack available."
+            return note + "Execution is paused but no call stack available."
+
+        # Format call stack; pieces are joined once at the end
+        parts = [note, f"📍 Execution paused: {reason}\n\nCall Stack:\n{'=' * 60}\n\n"]
 
-        # Format call stack
-        result = f"📍 Execution paused: {reason}\n\n"
-        result += "Call Stack:\n"
-        result += "=" * 60 + "\n\n"
+        total = len(call_frames)
+        if max_frames > 0 and total > max_frames:
+            call_frames = call_frames[:max_frames]
 
         for i, frame in enumerate(call_frames):
             call_frame_id = frame.get("callFrameId", "unknown")
@@ -1560,28 +2636,62 @@ async def debugger_get_call_stack(connection_id: Optional[str] = None) -> str:
             line_num = location.get("lineNumber", 0) + 1  # Convert to 1-indexed
             col_num = location.get("columnNumber", 0)
 
-            result += f"[{i}] {func_name}\n"
-            result += f"    Frame ID: {call_frame_id}\n"
-            result += f"    Location: {url}:{line_num}:{col_num}\n"
+            parts.append(f"[{i}] {func_name}\n    Frame ID: {call_frame_id}\n    Location: {url}:{line_num}:{col_num}\n")
 
             # Show scope chain
             scope_chain = frame.get("scopeChain", [])
             if scope_chain:
-                scopes = [s.get("type", "unknown") for s in scope_chain]
-                result += f"    Scopes: {', '.join(scopes)}\n"
+                scopes = ", ".join(s.get("type", "unknown") for s in scope_chain)
+                parts.append(f"    Scopes: {scopes}\n")
 
-            result += "\n"
+            parts.append("\n")
 
-        result += "\nUse debugger_evaluate_on_call_frame(call_frame_id, expression) to inspect variables."
-        result += "\nUse debugger_step_over/into/out() to continue stepping, or debugger_resume() to continue execution."
+        if total > len(call_frames):
+            parts.append(f"... ({total - len(call_frames)} more frames; raise max_frames to see them)\n")
 
-        return result
+        parts.append("\nUse debugger_evaluate_on_call_frame(call_frame_id, expression) to inspect variables.")
+        parts.append("\nUse debugger_step_over/into/out() to continue stepping, or debugger_resume() to continue execution.")
+
+        return "".join(parts)
     except Exception as e:
         return f"Error getting call stack: {str(e)}"
 
 
+def _format_evaluation(expression: str, result: dict) -> str:
+    """Render a Debugger.evaluateOnCallFrame result for one expression"""
+    if "exceptionDetails" in result:
+        exception = result["exceptionDetails"]
+        error_text = exception.get("text", "Unknown error")
+        return f"❌ Evaluation error: {error_text}\n\nExpression: {expression}"
+
+    result_obj = result.get("result", {})
+    result_type = result_obj.get("type", "undefined")
+    result_value = result_obj.get("value")
+
+    # Format the result nicely
+    response = f"✓ Evaluated: {expression}\n\n"
+    response += f"Type: {result_type}\n"
+
+    if result_value is not None:
+        # Only containers need the indenting encoder
+        if isinstance(result_value, (dict, list)):
+            value_text = _json_dumps_pretty(result_value)
+        else:
+            value_text = _json_dumps(result_value)
+        response += f"Value: {value_text}"
+    else:
+        # Description is only shown when there is no value
+        result_description = result_obj.get("description")
+        if result_description:
+            response += f"Description: {result_description}"
+        else:
+            response += f"Result: {result_type}"
+
+    return response
+
+
 @mcp.tool()
-async def debugger_evaluate_on_call_frame(call_frame_id: str, expression: str, connection_id: Optional[str] = None) -> str:
+async def debugger_evaluate_on_call_frame(call_frame_id: str, expression: str, return_by_value: bool = True, connection_id: Optional[str] = None) -> str:
     """
     Evaluate a JavaScript expression in the context of a specific call frame.
 
@@ -1595,6 +2705,10 @@ async def debugger_evaluate_on_call_frame(call_frame_id: str, expression: str, c
     Args:
         call_frame_id: Call frame ID from debugger_get_call_stack() (e.g., "frame0")
         expression: JavaScript expression to evaluate in that frame's scope
+        return_by_value: Return the value as JSON (default: True). Set False for
+            values that don't serialize (DOM nodes, functions) to get their
+            description instead
+        connection_id: Chrome connection to use (uses default if not specified)
 
     Returns:
         Result of the expression evaluation
@@ -1606,12 +2720,9 @@ async def debugger_evaluate_on_call_frame(call_frame_id: str, expression: str, c
         result = debugger_evaluate_on_call_frame("frame0", "user.name")
         result = debugger_evaluate_on_call_frame("frame0", "items.filter(i => i.active)")
     """
-    await ensure_chrome_client()
-
-    cdp = chrome_client.cdp_manager.get_connection(connection_id)
-    if not cdp:
-        conn_msg = f" '{connection_id}'" if connection_id else ""
-        return f"Error: No Chrome connection{conn_msg} found. Use chrome_connect() or chrome_launch() first."
+    cdp, error = await _resolve_cdp(connection_id)
+    if error:
+        return error
 
     try:
         # Check if execution is paused
@@ -1619,37 +2730,71 @@ async def debugger_evaluate_on_call_frame(call_frame_id: str, expression: str, c
             return "Not paused. Cannot evaluate expressions outside of paused context."
 
         # Evaluate expression in the call frame
+        # No preview: only value/description are shown
         params = {
             "callFrameId": call_frame_id,
-            "expression": expression
+            "expression": expression,
+            "returnByValue": return_by_value,
+            "generatePreview": False,
+            "throwOnSideEffect": False
         }
 
         result = await cdp.send_command("Debugger.evaluateOnCallFrame", params)
 
-        if "exceptionDetails" in result:
-            exception = result["exceptionDetails"]
-            error_text = exception.get("text", "Unknown error")
-            return f"❌ Evaluation error: {error_text}\n\nExpression: {expression}"
+        return _format_evaluation(expression, result)
+    except Exception as e:
+        return f"Error evaluating expression: {str(e)}"
 
-        result_obj = result.get("result", {})
-        result_type = result_obj.get("type", "undefined")
-        result_value = result_obj.get("value")
-        result_description = result_obj.get("description")
 
-        # Format the result nicely
-        response = f"✓ Evaluated: {expression}\n\n"
-        response += f"Type: {result_type}\n"
+@mcp.tool()
+async def debugger_evaluate_on_call_frame_batch(call_frame_id: str, expressions: List[str], connection_id: Optional[str] = None) -> str:
+    """
+    Evaluate several JavaScript expressions in the same call frame at once.
 
-        if result_value is not None:
-            response += f"Value: {json.dumps(result_value, indent=2)}"
-        elif result_description:
-            response += f"Description: {result_description}"
-        else:
-            response += f"Result: {result_type}"
+    The evaluations are sent together and their replies awaited concurrently,
+    so inspecting N values costs about one round-trip instead of N. Values are
+    returned by value (JSON), like debugger_evaluate_on_call_frame's output.
 
-        return response
-    except Exception as e:
-        return f"Error evaluating expression: {str(e)}"
+    Args:
+        call_frame_id: Call frame ID from debugger_get_call_stack()
+        expressions: JavaScript expressions to evaluate in that frame's scope
+        connection_id: Chrome connection to use (uses default if not specified)
+
+    Returns:
+        One result block per expression, in order
+
+    Example:
+        debugger_evaluate_on_call_frame_batch("frame0", ["user", "user.id", "response.data"])
+    """
+    cdp, error = await _resolve_cdp(connection_id)
+    if error:
+        return error
+
+    if not cdp.paused_data:
+        return "Not paused. Cannot evaluate expressions outside of paused context."
+
+    if not expressions:
+        return "Error: No expressions given"
+
+    results = await asyncio.gather(
+        *(
+            cdp.send_command("Debugger.evaluateOnCallFrame", {
+                "callFrameId": call_frame_id,
+                "expression": expression,
+                "returnByValue": True,
+                "generatePreview": False
+            })
+            for expression in expressions
+        ),
+        return_exceptions=True
+    )
+
+    blocks = [
+        f"Error evaluating {expression}: {result}" if isinstance(result, BaseException)
+        else _format_evaluation(expression, result)
+        for expression, result in zip(expressions, results)
+    ]
+    return f"\n\n{'-' * 60}\n\n".join(blocks)
 
 
 @mcp.tool()
@@ -1667,19 +2812,17 @@ async def debugger_step_over(connection_id: Optional[str] = None) -> str:
     Returns:
         Status message
     """
-    await ensure_chrome_client()
-
-    cdp = chrome_client.cdp_manager.get_connection(connection_id)
-    if not cdp:
-        conn_msg = f" '{connection_id}'" if connection_id else ""
-        return f"Error: No Chrome connection{conn_msg} found. Use chrome_connect() or chrome_launch() first."
+    cdp, error = await _resolve_cdp(connection_id)
+    if error:
+        return error
 
+    note = _failed_acks_note(cdp)
     try:
         if not cdp.paused_data:
-            return "Not paused. Cannot step when execution is not paused."
+            return note + _MSG_NOT_PAUSED_STEP
 
-        await cdp.send_command("Debugger.stepOver", {})
-        return "✓ Stepped over. Execution will pause at next line.\nUse debugger_get_call_stack() to see current location."
+        await cdp.send_command_nowait("Debugger.stepOver", leaves_pause=True)
+        return note + _MSG_STEP_OVER
     except Exception as e:
         return f"Error stepping over: {str(e)}"
 
@@ -1699,19 +2842,17 @@ async def debugger_step_into(connection_id: Optional[str] = None) -> str:
     Returns:
         Status message
     """
-    await ensure_chrome_client()
-
-    cdp = chrome_client.cdp_manager.get_connection(connection_id)
-    if not cdp:
-        conn_msg = f" '{connection_id}'" if connection_id else ""
-        return f"Error: No Chrome connection{conn_msg} found. Use chrome_connect() or chrome_launch() first."
+    cdp, error = await _resolve_cdp(connection_id)
+    if error:
+        return error
 
+    note = _failed_acks_note(cdp)
     try:
         if not cdp.paused_data:
-            return "Not paused. Cannot step when execution is not paused."
+            return note + _MSG_NOT_PAUSED_STEP
 
-        await cdp.send_command("Debugger.stepInto", {})
-        return "✓ Stepped into function. Execution will pause at first line.\nUse debugger_get_call_stack() to see current location."
+        await cdp.send_command_nowait("Debugger.stepInto", leaves_pause=True)
+        return note + _MSG_STEP_INTO
     except Exception as e:
         return f"Error stepping into: {str(e)}"
 
@@ -1731,19 +2872,17 @@ async def debugger_step_out(connection_id: Optional[str] = None) -> str:
     Returns:
         Status message
     """
-    await ensure_chrome_client()
-
-    cdp = chrome_client.cdp_manager.get_connection(connection_id)
-    if not cdp:
-        conn_msg = f" '{connection_id}'" if connection_id else ""
-        return f"Error: No Chrome connection{conn_msg} found. Use chrome_connect() or chrome_launch() first."
+    cdp, error = await _resolve_cdp(connection_id)
+    if error:
+        return error
 
+    note = _failed_acks_note(cdp)
     try:
         if not cdp.paused_data:
-            return "Not paused. Cannot step when execution is not paused."
+            return note + _MSG_NOT_PAUSED_STEP
 
-        await cdp.send_command("Debugger.stepOut", {})
-        return "✓ Stepped out of function. Execution will pause at caller.\nUse debugger_get_call_stack() to see current location."
+        await cdp.send_command_nowait("Debugger.stepOut", leaves_pause=True)
+        return note + _MSG_STEP_OUT
     except Exception as e:
         return f"Error stepping out: {str(e)}"
 
@@ -1761,19 +2900,17 @@ async def debugger_resume(connection_id: Optional[str] = None) -> str:
     Returns:
         Status message
     """
-    await ensure_chrome_client()
-
-    cdp = chrome_client.cdp_manager.get_connection(connection_id)
-    if not cdp:
-        conn_msg = f" '{connection_id}'" if connection_id else ""
-        return f"Error: No Chrome connection{conn_msg} found. Use chrome_connect() or chrome_launch() first."
+    cdp, error = await _resolve_cdp(connection_id)
+    if error:
+        return error
 
+    note = _failed_acks_note(cdp)
     try:
         if not cdp.paused_data:
-            return "Not paused. Nothing to resume."
+            return note + "Not paused. Nothing to resume."
 
-        await cdp.send_command("Debugger.resume", {})
-        return "✓ Execution resumed. Will pause at next breakpoint or exception."
+        await cdp.send_command_nowait("Debugger.resume", leaves_pause=True)
+        return note + _MSG_RESUMED
     except Exception as e:
         return f"Error resuming: {str(e)}"
 
@@ -1793,16 +2930,18 @@ async def debugger_pause(connection_id: Optional[str] = None) -> str:
     Returns:
         Status message
     """
-    await ensure_chrome_client()
+    cdp, error = await _resolve_cdp(connection_id)
+    if error:
+        return error
 
-    cdp = chrome_client.cdp_manager.get_connection(connection_id)
-    if not cdp:
-        conn_msg = f" '{connection_id}'" if connection_id else ""
-        return f"Error: No Chrome connection{conn_msg} found. Use chrome_connect() or chrome_launch() first."
+    note = _failed_acks_note(cdp)
+    # The ack isn't awaited, so catch the common rejection up front
+    if not cdp.debugger_enabled:
+        return note + "Debugger not enabled. Call debugger_enable() first."
 
     try:
-        await cdp.send_command("Debugger.pause", {})
-        return "✓ Pause requested. Execution will pause at next statement.\nUse debugger_get_call_stack() once paused."
+        await cdp.send_command_nowait("Debugger.pause")
+        return note + _MSG_PAUSE_REQUESTED
     except Exception as e:
         return f"Error pausing: {str(e)}"
 
@@ -1818,25 +2957,71 @@ async def debugger_remove_breakpoint(breakpoint_id: str, connection_id: Optional
     Returns:
         Confirmation message
     """
-    await ensure_chrome_client()
-
-    cdp = chrome_client.cdp_manager.get_connection(connection_id)
-    if not cdp:
-        conn_msg = f" '{connection_id}'" if connection_id else ""
-        return f"Error: No Chrome connection{conn_msg} found. Use chrome_connect() or chrome_launch() first."
+    cdp, error = await _resolve_cdp(connection_id)
+    if error:
+        return error
 
     try:
         await cdp.send_command("Debugger.removeBreakpoint", {"breakpointId": breakpoint_id})
 
         # Remove from our tracking
-        if breakpoint_id in cdp.breakpoints:
-            del cdp.breakpoints[breakpoint_id]
+        info = cdp.breakpoints.pop(breakpoint_id, None)
+        if info is not None:
+            cdp.bp_by_location.pop(info.location, None)
+            await _clear_hit_slots(cdp, [info])
 
         return f"✓ Breakpoint {breakpoint_id} removed successfully"
     except Exception as e:
         return f"Error removing breakpoint: {str(e)}"
 
 
+@mcp.tool()
+async def debugger_remove_breakpoints(breakpoint_ids: List[str], connection_id: Optional[str] = None) -> str:
+    """
+    Remove several breakpoints at once (sent concurrently, like debugger_set_breakpoints).
+
+    Args:
+        breakpoint_ids: Breakpoint IDs returned from debugger_set_breakpoint(s)
+        connection_id: Chrome connection to use (uses default if not specified)
+
+    Returns:
+        Confirmation message listing any failures
+    """
+    cdp, error = await _resolve_cdp(connection_id)
+    if error:
+        return error
+
+    if not breakpoint_ids:
+        return "Error: No breakpoint IDs given"
+
+    results = await asyncio.gather(
+        *(cdp.send_command("Debugger.removeBreakpoint", {"breakpointId": bp_id}) for bp_id in breakpoint_ids),
+        return_exceptions=True
+    )
+
+    failed = []
+    removed = []
+    for bp_id, result in zip(breakpoint_ids, results):
+        if isinstance(result, BaseException):
+            failed.append(f"{bp_id}: {result}")
+        else:
+            # Remove from our tracking
+            info = cdp.breakpoints.pop(bp_id, None)
+            if info is not None:
+                cdp.bp_by_location.pop(info.location, None)
+                removed.append(info)
+    await _clear_hit_slots(cdp, removed)
+
+    response = f"✓ Removed {len(breakpoint_ids) - len(failed)} of {len(breakpoint_ids)} breakpoints"
+    if failed:
+        response += "\n\nFailed:\n" + "\n".join(failed)
+    return response
+
+
+# Confirmation shown for Debugger.setPauseOnExceptions, before the state's own line
+_MSG_PAUSE_CONFIGURED = "✓ Exception breaking configured\n\n"
+
+
 @mcp.tool()
 async def debugger_set_pause_on_exceptions(state: str, connection_id: Optional[str] = None) -> str:
     """
@@ -1854,29 +3039,38 @@ async def debugger_set_pause_on_exceptions(state: str, connection_id: Optional[s
     Example:
         debugger_set_pause_on_exceptions("all")  # Pause on any exception
     """
-    await ensure_chrome_client()
-
-    cdp = chrome_client.cdp_manager.get_connection(connection_id)
-    if not cdp:
-        conn_msg = f" '{connection_id}'" if connection_id else ""
-        return f"Error: No Chrome connection{conn_msg} found. Use chrome_connect() or chrome_launch() first."
-
-    if state not in ["none", "uncaught", "all"]:
-        return f"Error: state must be 'none', 'uncaught', or 'all' (got '{state}')"
+    cdp, error = await _resolve_cdp(connection_id)
+    if error:
+        return error
+
+    # Validate and pick the confirmation in one dispatch
+    match state:
+        case "none":
+            detail = "Will not pause on exceptions"
+        case "uncaught":
+            detail = "Will pause only on uncaught exceptions"
+        case "all":
+            detail = "Will pause on all exceptions (caught and uncaught)"
+        case _:
+            return f"Error: state must be 'none', 'uncaught', or 'all' (got '{state}')"
+    response = _MSG_PAUSE_CONFIGURED + detail
+
+    # Already in this state: skip the round-trip
+    if cdp.pause_on_exceptions == state:
+        return response
 
     try:
         await cdp.send_command("Debugger.setPauseOnExceptions", {"state": state})
+        cdp.pause_on_exceptions = state
 
-        messages = {
-            "none": "Will not pause on exceptions",
-            "uncaught": "Will pause only on uncaught exceptions",
-            "all": "Will pause on all exceptions (caught and uncaught)"
-        }
-
-        return f"✓ Exception breaking configured\n\n{messages[state]}"
+        return response
     except Exception as e:
         return f"Error setting pause on exceptions: {str(e)}"
 
 
 if __name__ == "__main__":
+    # Run the server (and its CDP websockets) on uvloop when it is installed
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        logger.info("Using uvloop event loop")
     mcp.run()